@@ -6,7 +6,7 @@
 
 {
     "name": "Base Url",
-    "version": "10.0.0.1.0",
+    "version": "10.0.0.2.0",
     "category": "tools",
     "license": "AGPL-3",
     "summary": "keep history of url for products & categories  ",
@@ -94,24 +94,42 @@ class AbstractUrl(models.AbstractModel):
         self.ensure_one()
         return key
 
+    def _post_process_url_keys(self, key_by_id):
+        """This method post process the keys of all the records computed
+        together (see `_post_process_url_key`). Override it if the keys of
+        the records depend on each other (ex: keys built from the key of
+        the parent record)
+
+        :param key_by_id: dict {record id: slugified key}
+        :return: dict {record id: url key}
+        """
+        return {
+            record.id: record._post_process_url_key(key_by_id[record.id])
+            for record in self
+            if record.id in key_by_id
+        }
+
     def _generic_compute_automatic_url_key(self):
         records_by_lang = defaultdict(self.browse)
         for record in self:
             records_by_lang[record.lang_id] |= record
 
+        # the same keywords are slugified once for the whole batch
+        slug_cache = {}
         key_by_id = {}
         for lang_id, records in records_by_lang.items():
             for record in records.with_context(lang=lang_id.code):
                 if not isinstance(record.id, models.NewId):
-                    key_by_id[record.id] = slugify(
-                        "-".join(record._get_url_keywords())
-                    )
+                    keywords = tuple(record._get_url_keywords())
+                    cache_key = (lang_id.code, keywords)
+                    if cache_key not in slug_cache:
+                        slug_cache[cache_key] = slugify("-".join(keywords))
+                    key_by_id[record.id] = slug_cache[cache_key]
 
+        url_key_by_id = self._post_process_url_keys(key_by_id)
         for record in self:
             if not isinstance(record.id, models.NewId):
-                record.automatic_url_key = record._post_process_url_key(
-                    key_by_id[record.id]
-                )
+                record.automatic_url_key = url_key_by_id[record.id]
 
     @api.multi
     def _compute_automatic_url_key(self):
@@ -134,22 +152,65 @@ class AbstractUrl(models.AbstractModel):
                     new_url = record.automatic_url_key
                 record.url_key = new_url
 
+    def _get_url_urls(self, domain=None):
+        """
+        Get the urls of the records with one search
+        :param domain: optional domain to filter the urls
+        :return: dict {record: url.url recordset}
+        """
+        url_obj = self.env["url.url"]
+        refs = [
+            get_model_ref(record)
+            for record in self
+            if not isinstance(record.id, models.NewId)
+        ]
+        url_ids_by_ref = defaultdict(list)
+        if refs:
+            for url in url_obj.search(
+                [("model_id", "in", refs)] + (domain or [])
+            ):
+                url_ids_by_ref[get_model_ref(url.model_id)].append(url.id)
+        return {
+            record: url_obj.browse(url_ids_by_ref[get_model_ref(record)])
+            for record in self
+        }
+
+    def _get_redirect_url_keys(self):
+        """
+        Get the redirect url keys of the records with one grouped query
+        :return: dict {record id: list of url keys}
+        """
+        res = {record.id: [] for record in self}
+        id_by_ref = {
+            get_model_ref(record): record.id
+            for record in self
+            if not isinstance(record.id, models.NewId)
+        }
+        if id_by_ref:
+            self.env.cr.execute(
+                """
+                SELECT model_id, array_agg(url_key ORDER BY id)
+                FROM url_url
+                WHERE redirect AND model_id IN %s
+                GROUP BY model_id
+                """,
+                (tuple(id_by_ref.keys()),),
+            )
+            for model_ref, url_keys in self.env.cr.fetchall():
+                res[id_by_ref[model_ref]] = url_keys
+        return res
+
     @api.multi
     def _compute_redirect_url_url_ids(self):
+        urls = self._get_url_urls([("redirect", "=", True)])
         for record in self:
-            record.redirect_url_url_ids = record.env["url.url"].search(
-                [
-                    ("model_id", "=", get_model_ref(record)),
-                    ("redirect", "=", True),
-                ]
-            )
+            record.redirect_url_url_ids = urls[record]
 
     @api.multi
     def _compute_url_url_ids(self):
+        urls = self._get_url_urls()
         for record in self:
-            record.url_url_ids = record.env["url.url"].search(
-                [("model_id", "=", get_model_ref(record))]
-            )
+            record.url_url_ids = urls[record]
 
     @api.model
     def _prepare_url(self, url_key):
@@ -223,6 +284,96 @@ class AbstractUrl(models.AbstractModel):
         """
         return True
 
+    def _set_urls(self):
+        """ Set the url_key of the records as their current url
+
+        Same as `set_url` but for the whole recordset at once:
+        1 the existing urls of all the keys are read with one search
+        2 all the conflicts are reported together
+        3 the urls are created or reused
+        4 the other urls of the records are redirected with one write
+        """
+        url_obj = self.env["url.url"]
+        if not self:
+            return
+        key_by_record = {}
+        for record in self:
+            key_by_record[record] = (
+                get_model_ref(record.backend_id),
+                record.lang_id.id,
+                record.url_key,
+            )
+        keys = key_by_record.values()
+        existing_urls = url_obj.search(
+            [
+                ("url_key", "in", list({key[2] for key in keys})),
+                ("backend_id", "in", list({key[0] for key in keys})),
+                ("lang_id", "in", list({key[1] for key in keys})),
+            ]
+        )
+        url_by_key = {
+            (get_model_ref(url.backend_id), url.lang_id.id, url.url_key): url
+            for url in existing_urls
+        }
+        record_by_key = {}
+        conflicts = []
+        to_create = []
+        to_reuse = []
+        to_restore = url_obj.browse()
+        for record in self:
+            key = key_by_record[record]
+            if key in record_by_key:
+                # the same key is set on several records of the batch
+                conflicts.append((record, key[2], False))
+                continue
+            record_by_key[key] = record
+            existing_url = url_by_key.get(key)
+            if not existing_url:
+                to_create.append(record)
+            elif existing_url.model_id != record:
+                if existing_url.redirect:
+                    to_reuse.append((record, existing_url))
+                else:
+                    conflicts.append(
+                        (
+                            existing_url.model_id,
+                            existing_url.url_key,
+                            existing_url.id,
+                        )
+                    )
+            elif existing_url.redirect:
+                to_restore |= existing_url
+        if conflicts:
+            raise UserError(
+                _("Url_key already exist in other model")
+                + "".join(
+                    [
+                        "\n- name: %s\n - id: %s\n"
+                        "- url_key: %s\n - url_key_id %s\n"
+                        % (model.name, model.id, url_key, url_id)
+                        for model, url_key, url_id in conflicts
+                    ]
+                )
+            )
+        to_restore.write({"redirect": False})
+        for record, existing_url in to_reuse:
+            record._reuse_url(existing_url)
+        for record in to_create:
+            url_obj.create(record._prepare_url(record.url_key))
+        # other url of objects set redirect to True
+        url_key_by_ref = {
+            get_model_ref(record): record.url_key for record in self
+        }
+        redirect_urls = url_obj.search(
+            [
+                ("model_id", "in", list(url_key_by_ref.keys())),
+                ("redirect", "=", False),
+            ]
+        ).filtered(
+            lambda u: u.url_key != url_key_by_ref[get_model_ref(u.model_id)]
+        )
+        redirect_urls.write({"redirect": True})
+
     @api.multi
     def _sync_urls(self):
         """
@@ -230,25 +381,39 @@ class AbstractUrl(models.AbstractModel):
         the current model
         """
         records = self.filtered("is_urls_sync_required")
-        for record in records:
-            if not record.active:
-                record._redirect_existing_url()
-            else:
-                record.set_url(record.url_key)
+        inactive_records = records.filtered(lambda r: not r.active)
+        if inactive_records:
+            inactive_records._redirect_existing_url()
+        (records - inactive_records)._set_urls()
+        records._set_urls_synced()
         return records
 
+    def _set_urls_synced(self):
+        """
+        Flag the urls of the records as synchronized with one query
+        """
+        if not self:
+            return
+        self.env.cr.execute(
+            "UPDATE %s SET is_urls_sync_required = false WHERE id IN %%s"
+            % self._table,
+            (tuple(self.ids),),
+        )
+        self.invalidate_cache(["is_urls_sync_required"], self.ids)
+
     @api.model
     def create(self, value):
         res = super(AbstractUrl, self).create(value)
-        synced = res._sync_urls()
-        super(AbstractUrl, synced).write({"is_urls_sync_required": False})
+        # the records created in bulk sync their urls together (see
+        # `_sync_urls`)
+        if not self.env.context.get("defer_urls_sync"):
+            res._sync_urls()
         return res
 
     @api.multi
     def write(self, value):
         res = super(AbstractUrl, self).write(value)
-        synced = self._sync_urls()
-        super(AbstractUrl, synced).write({"is_urls_sync_required": False})
+        self._sync_urls()
         return res
 
     @api.multi
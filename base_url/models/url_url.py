@@ -7,10 +7,13 @@ import logging
 
 from odoo import api, fields, models
 
+from ..tools import StampedCache
 from .abstract_url import get_model_ref
 
 _logger = logging.getLogger(__name__)
 
+RESOLVE_URL_CACHE = StampedCache("url.url.resolve_url")
+
 
 class UrlUrl(models.Model):
 
@@ -46,6 +49,27 @@ class UrlUrl(models.Model):
         )
     ]
 
+    @api.model_cr
+    def init(self):
+        """
+        Index the urls by record (see `abstract.url._get_url_urls`). The
+        resolution by key uses the index of the unique constraint
+        """
+        res = super(UrlUrl, self).init()
+        RESOLVE_URL_CACHE.init(self._cr)
+        self._cr.execute(
+            "SELECT indexname FROM pg_indexes WHERE indexname = %s",
+            ("url_url_model_id_redirect_index",),
+        )
+        if not self._cr.fetchone():
+            self._cr.execute(
+                """
+            CREATE INDEX url_url_model_id_redirect_index
+            ON url_url (model_id, redirect);
+            """
+            )
+        return res
+
     @api.depends("model_id")
     def _compute_related_fields(self):
         for record in self:
@@ -56,8 +80,114 @@ class UrlUrl(models.Model):
     def _reference_models(self):
         return []
 
-    def _get_object(self, url):
+    def _get_object(self, url, backend=None, lang=None):
         """
         :return: return object attach to the url
         """
+        if backend and lang:
+            return self.resolve_url(backend, lang, url)[0]
         return self.search([("url_key", "=", url)]).model_id
+
+    @api.model
+    def _resolve_url_key(self, backend_ref, lang_id, url_key):
+        """
+        Cached resolution of an url key. The cache is evicted by
+        `_invalidate_resolve_url_cache`.
+        :param backend_ref: reference of the backend ("model,id")
+        :param lang_id: int
+        :param url_key: str
+        :return: tuple (model_id reference, redirect) or None
+        """
+        return RESOLVE_URL_CACHE.get(
+            self.env.cr,
+            (backend_ref, lang_id, url_key),
+            lambda: self._read_url_key(backend_ref, lang_id, url_key),
+        )
+
+    @api.model
+    def _read_url_key(self, backend_ref, lang_id, url_key):
+        self.env.cr.execute(
+            """
+            SELECT model_id, redirect
+            FROM url_url
+            WHERE url_key = %s AND backend_id = %s AND lang_id = %s
+            """,
+            (url_key, backend_ref, lang_id),
+        )
+        row = self.env.cr.fetchone()
+        return tuple(row) if row else None
+
+    def _browse_reference(self, reference):
+        model, res_id = reference.split(",")
+        return self.env[model].browse(int(res_id))
+
+    @api.model
+    def resolve_url(self, backend, lang, url_key):
+        """
+        Get the record linked to an url key of a backend and a lang.
+        If the url is a redirection, the record is the target of the
+        redirection and its current url is its url_key.
+        :param backend: backend recordset
+        :param lang: res.lang recordset
+        :param url_key: str
+        :return: tuple (record or None, redirect)
+        """
+        res = self._resolve_url_key(get_model_ref(backend), lang.id, url_key)
+        if not res:
+            return None, False
+        return self._browse_reference(res[0]), res[1]
+
+    @api.model
+    def resolve_urls(self, backend, lang, url_keys):
+        """
+        Same as `resolve_url` for several keys with one query
+        :param backend: backend recordset
+        :param lang: res.lang recordset
+        :param url_keys: list of str
+        :return: dict {url_key: (record, redirect)} (only the keys found)
+        """
+        if not url_keys:
+            return {}
+        self.env.cr.execute(
+            """
+            SELECT url_key, model_id, redirect
+            FROM url_url
+            WHERE url_key IN %s AND backend_id = %s AND lang_id = %s
+            """,
+            (tuple(url_keys), get_model_ref(backend), lang.id),
+        )
+        return {
+            url_key: (self._browse_reference(model_ref), redirect)
+            for url_key, model_ref, redirect in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _get_resolve_url_cache_fields(self):
+        return ["url_key", "redirect", "model_id", "backend_id", "lang_id"]
+
+    @api.model
+    def _invalidate_resolve_url_cache(self):
+        """
+        Evict the resolutions of the urls of all the workers once the
+        current transaction is committed
+        """
+        RESOLVE_URL_CACHE.invalidate(self.env.cr)
+
+    @api.model
+    def create(self, vals):
+        record = super(UrlUrl, self).create(vals)
+        self._invalidate_resolve_url_cache()
+        return record
+
+    @api.multi
+    def write(self, vals):
+        res = super(UrlUrl, self).write(vals)
+        if set(vals) & set(self._get_resolve_url_cache_fields()):
+            self._invalidate_resolve_url_cache()
+        return res
+
+    @api.multi
+    def unlink(self):
+        res = super(UrlUrl, self).unlink()
+        self._invalidate_resolve_url_cache()
+        return res
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 # Copyright 2019 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+import logging
+
 import mock
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 from odoo.tests import SavepointCase
 
+from ..models.url_url import RESOLVE_URL_CACHE
 from .models import ResPartnerAddressableFake, UrlBackendFake
 
+_logger = logging.getLogger(__name__)
+
 
 class TestAbstractUrl(SavepointCase):
     @classmethod
@@ -102,6 +107,219 @@ class TestAbstractUrl(SavepointCase):
         url_keys = set(my_partner.mapped("url_url_ids.url_key"))
         self.assertSetEqual(url_keys, {manual_url_key, self.auto_key})
 
+    def test_write_url_builder_multi(self):
+        value = self._get_default_partner_value()
+        partner_1 = self.ResPartnerAddressable.create(
+            dict(value, name="partner 1")
+        )
+        partner_2 = self.ResPartnerAddressable.create(
+            dict(value, name="partner 2")
+        )
+        partner_1.write({"url_builder": "manual", "manual_url_key": "key-1"})
+        partner_2.write({"url_builder": "manual", "manual_url_key": "key-2"})
+        partners = partner_1 | partner_2
+        # the automatic urls are restored for all the records at once
+        partners.write({"url_builder": "auto"})
+        partners.refresh()
+        for partner, auto_key, manual_key in (
+            (partner_1, "partner-1", "key-1"),
+            (partner_2, "partner-2", "key-2"),
+        ):
+            self.assertEqual(2, len(partner.url_url_ids))
+            self.assertEqual(
+                partner.url_url_ids.filtered(lambda u: not u.redirect).url_key,
+                auto_key,
+            )
+            self.assertEqual(partner.redirect_url_url_ids.url_key, manual_key)
+
+    def test_create_defer_urls_sync(self):
+        value = self._get_default_partner_value()
+        model = self.ResPartnerAddressable.with_context(defer_urls_sync=True)
+        partners = model.create(dict(value, name="partner 1"))
+        partners |= model.create(dict(value, name="partner 2"))
+        self.assertFalse(partners.mapped("url_url_ids"))
+        self.assertTrue(all(partners.mapped("is_urls_sync_required")))
+        # the urls of the records created in bulk are synchronized together
+        partners._sync_urls()
+        self._check_url_key(partners[0], "partner-1")
+        self._check_url_key(partners[1], "partner-2")
+
+    def test_redirect_url_keys_benchmark(self):
+        value = self._get_default_partner_value()
+        model = self.ResPartnerAddressable.with_context(defer_urls_sync=True)
+        partners = model.browse()
+        for i in range(1000):
+            partners |= model.create(dict(value, name="partner %s" % i))
+        partners._sync_urls()
+        self.env.cr.execute(
+            """
+            INSERT INTO url_url (url_key, redirect, model_id, backend_id,
+                lang_id)
+            SELECT 'old-' || url_key, true, model_id, backend_id, lang_id
+            FROM url_url
+            WHERE model_id IN %s
+            """,
+            (tuple("%s,%s" % (p._name, p.id) for p in partners),),
+        )
+
+        def count_queries(read):
+            partners.invalidate_cache()
+            count = self.env.cr.sql_log_count
+            res = read()
+            return self.env.cr.sql_log_count - count, res
+
+        # former path: the redirect urls are read binding by binding
+        before, url_keys_before = count_queries(
+            lambda: {
+                p.id: p.with_prefetch().redirect_url_url_ids.mapped("url_key")
+                for p in partners
+            }
+        )
+        after, url_keys_after = count_queries(partners._get_redirect_url_keys)
+        _logger.info(
+            "Redirect url keys of %s records: %s queries before, %s after",
+            len(partners),
+            before,
+            after,
+        )
+        self.assertEqual(url_keys_after, url_keys_before)
+        self.assertEqual(url_keys_after[partners[0].id], ["old-partner-0"])
+        self.assertGreaterEqual(before, len(partners))
+        self.assertEqual(after, 1)
+
+    def test_write_multi_url_conflicts(self):
+        value = self._get_default_partner_value()
+        partner_1 = self.ResPartnerAddressable.create(
+            dict(value, name="partner 1")
+        )
+        partner_2 = self.ResPartnerAddressable.create(
+            dict(value, name="partner 2")
+        )
+        partner_3 = self.ResPartnerAddressable.create(
+            dict(value, name="partner 3")
+        )
+        # all the conflicts are reported at once
+        with self.assertRaises(UserError) as cm:
+            (partner_1 | partner_2 | partner_3).write(
+                {"url_builder": "manual", "manual_url_key": "partner-3"}
+            )
+        message = cm.exception.name
+        # partner_1 conflicts with the url of partner_3, partner_2 and
+        # partner_3 with the key of partner_1 in the batch
+        self.assertIn("- id: %s\n" % partner_3.id, message)
+        self.assertIn("- id: %s\n" % partner_2.id, message)
+        self.assertNotIn("- id: %s\n" % partner_1.id, message)
+
+    def test_resolve_url(self):
+        my_partner = self._create_auto()
+        self.assertEqual(
+            self.UrlUrl.resolve_url(self.url_backend, self.lang, "unknown"),
+            (None, False),
+        )
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (my_partner, False),
+        )
+        # the cache is invalidated when the urls are modified
+        my_partner.name = "my new name"
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (my_partner, True),
+        )
+        self.assertDictEqual(
+            self.UrlUrl.resolve_urls(
+                self.url_backend,
+                self.lang,
+                [self.auto_key, "my-new-name", "unknown"],
+            ),
+            {
+                self.auto_key: (my_partner, True),
+                "my-new-name": (my_partner, False),
+            },
+        )
+        self.assertEqual(
+            self.UrlUrl._get_object(
+                "my-new-name", backend=self.url_backend, lang=self.lang
+            ),
+            my_partner,
+        )
+
+    def _commit_resolve_url_cache(self):
+        # simulate the commit of the transaction and a new request
+        RESOLVE_URL_CACHE.bump(self.env.cr)
+        RESOLVE_URL_CACHE.reset(self.env.cr)
+
+    def test_resolve_url_cache(self):
+        partner = self._create_auto()
+        self._commit_resolve_url_cache()
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (partner, False),
+        )
+        hit = RESOLVE_URL_CACHE.hit
+        query_count = self.env.cr.sql_log_count
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (partner, False),
+        )
+        # a hit costs no query
+        self.assertEqual(RESOLVE_URL_CACHE.hit, hit + 1)
+        self.assertEqual(self.env.cr.sql_log_count, query_count)
+
+    def test_resolve_url_cache_eviction(self):
+        partner_1 = self._create_auto()
+        self._commit_resolve_url_cache()
+        self.assertEqual(
+            self.UrlUrl.resolve_url(self.url_backend, self.lang, "unknown"),
+            (None, False),
+        )
+        # the cursor with uncommitted changes doesn't use the cache
+        partner_1.write({"url_builder": "manual", "manual_url_key": "unknown"})
+        hit = RESOLVE_URL_CACHE.hit
+        self.assertEqual(
+            self.UrlUrl.resolve_url(self.url_backend, self.lang, "unknown"),
+            (partner_1, False),
+        )
+        self.assertEqual(RESOLVE_URL_CACHE.hit, hit)
+        # the entries cached before the commit are evicted
+        self._commit_resolve_url_cache()
+        self.assertEqual(
+            self.UrlUrl.resolve_url(self.url_backend, self.lang, "unknown"),
+            (partner_1, False),
+        )
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (partner_1, True),
+        )
+        self.assertEqual(RESOLVE_URL_CACHE.hit, hit)
+
+    def test_resolve_url_cache_other_worker(self):
+        partner = self._create_auto()
+        self._commit_resolve_url_cache()
+        self.UrlUrl.resolve_url(self.url_backend, self.lang, self.auto_key)
+        # simulate a change committed by another worker
+        self.env.cr.execute(
+            "UPDATE url_url SET redirect = true WHERE url_key = %s",
+            (self.auto_key,),
+        )
+        self._commit_resolve_url_cache()
+        self.assertEqual(
+            self.UrlUrl.resolve_url(
+                self.url_backend, self.lang, self.auto_key
+            ),
+            (partner, True),
+        )
+
     def test_write_launching_automatic_url_key(self):
         my_partner = self._create_auto()
         my_partner.name = "my new name"
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Akretion (http://www.akretion.com).
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import threading
+from contextlib import closing
+from functools import partial
+from weakref import WeakKeyDictionary
+
+from odoo.sql_db import db_connect
+from odoo.tools.lru import LRU
+
+STAMP_TABLE = "base_url_cache_stamp"
+
+
+class StampedCache(object):
+    """
+    Bounded LRU cache shared by the requests of a worker process.
+
+    The entries are tagged with a generation stamp stored in the database.
+    A change of the cached data calls `invalidate`: the stamp is bumped
+    after the commit of the change, which evicts the entries of all the
+    workers at once. The stamp is read once per cursor, so a hit costs no
+    query.
+
+    The stamp is read in the transaction of the request: an entry computed
+    before the commit of a change is tagged with the previous stamp. The
+    cursors with uncommitted changes don't use the cache.
+    """
+
+    def __init__(self, name, size=8192):
+        self.name = name
+        self.hit = 0
+        self.miss = 0
+        self._lru = LRU(size)
+        self._stamps = WeakKeyDictionary()
+        self._pending = WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+    def init(self, cr):
+        """
+        Create the stamp of the cache (called by the `init` of a model)
+        """
+        cr.execute(
+            """
+            CREATE TABLE IF NOT EXISTS %s (
+                name VARCHAR PRIMARY KEY,
+                value BIGINT NOT NULL DEFAULT 0
+            )
+            """
+            % STAMP_TABLE
+        )
+        cr.execute(
+            """
+            INSERT INTO %s (name)
+            SELECT %%s WHERE NOT EXISTS (
+                SELECT 1 FROM %s WHERE name = %%s
+            )
+            """
+            % (STAMP_TABLE, STAMP_TABLE),
+            (self.name, self.name),
+        )
+
+    def _get_stamp(self, cr):
+        with self._lock:
+            if cr in self._pending:
+                return None
+            if cr in self._stamps:
+                return self._stamps[cr]
+        cr.execute(
+            "SELECT value FROM %s WHERE name = %%s" % STAMP_TABLE,
+            (self.name,),
+        )
+        row = cr.fetchone()
+        stamp = row[0] if row else None
+        with self._lock:
+            self._stamps[cr] = stamp
+        return stamp
+
+    def get(self, cr, key, compute):
+        """
+        Get the value of the key, computed by `compute` on a miss
+        :param cr: cursor of the request
+        :param key: hashable key
+        :param compute: callable without argument
+        """
+        stamp = self._get_stamp(cr)
+        cache_key = (cr.dbname, key)
+        entry = self._lru.get(cache_key)
+        if stamp is not None and entry and entry[0] == stamp:
+            self.hit += 1
+            return entry[1]
+        self.miss += 1
+        value = compute()
+        if stamp is not None:
+            self._lru[cache_key] = (stamp, value)
+        return value
+
+    def invalidate(self, cr):
+        """
+        Evict all the entries once the transaction of the cursor is
+        committed. Until then, the cursor doesn't use the cache.
+        """
+        with self._lock:
+            if cr in self._pending:
+                return
+            self._pending[cr] = True
+        cr.after("commit", partial(self._signal, cr))
+        cr.after("rollback", partial(self.reset, cr))
+
+    def _signal(self, cr):
+        # The cursor of the change is committed: the stamp is bumped in a
+        # dedicated cursor as the one of the change may be closed right
+        # after the commit
+        with closing(db_connect(cr.dbname).cursor()) as stamp_cr:
+            stamp_cr.autocommit(True)
+            self.bump(stamp_cr)
+        self.reset(cr)
+
+    def bump(self, cr):
+        """
+        Bump the stamp of the cache in the transaction of the cursor
+        """
+        cr.execute(
+            "UPDATE %s SET value = value + 1 WHERE name = %%s" % STAMP_TABLE,
+            (self.name,),
+        )
+
+    def reset(self, cr):
+        """
+        Forget the stamp read by the cursor: it's read again at the next
+        access (ex: after the commit of the transaction)
+        """
+        with self._lock:
+            self._stamps.pop(cr, None)
+            self._pending.pop(cr, None)
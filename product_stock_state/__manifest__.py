@@ -10,7 +10,7 @@
     "name": "Product Stock State",
     "summary": "Compute the state stock based on"
     "the stock level and sale_ok field",
-    "version": "10.0.1.0.0",
+    "version": "10.0.1.1.0",
     "category": "Uncategorized",
     "website": "www.akretion.com",
     "author": " Akretion,GRAP",
@@ -25,6 +25,7 @@
         "views/product_product_view.xml",
         "views/product_category_view.xml",
         "views/sale_config_settings_view.xml",
+        "data/ir_cron.xml",
     ],
     "demo": [
         "demo/res_groups.xml",
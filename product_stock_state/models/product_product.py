@@ -7,7 +7,11 @@
 # @author Laurent Mignon <laurent.mignon@acsone.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+STOCK_STATE_CHUNK_SIZE = 1000
 
 
 class ProductProduct(models.Model):
@@ -23,22 +27,92 @@ class ProductProduct(models.Model):
     stock_state = fields.Selection(
         selection=_STOCK_STATE_SELECTION, compute="_compute_stock_state"
     )
+    stored_stock_state = fields.Selection(
+        selection=_STOCK_STATE_SELECTION,
+        readonly=True,
+        copy=False,
+        index=True,
+        help="Stock state stored by the stock synchronization, it can be "
+        "used to search the products by availability",
+    )
 
     def _compute_stock_state(self):
+        states = self._get_stock_states()
         for product in self:
-            if product.qty_available >= product._get_stock_state_threshold():
-                product.stock_state = "in_stock"
-            elif product.qty_available > 0:
-                product.stock_state = "in_limited_stock"
-            elif product.virtual_available > 0:
-                product.stock_state = "resupplying"
-            else:
-                product.stock_state = "out_of_stock"
+            product.stock_state = states[product.id]
+
+    @api.model
+    def _classify_stock_state(self, qty, virtual_qty, threshold):
+        if qty >= threshold:
+            return "in_stock"
+        elif qty > 0:
+            return "in_limited_stock"
+        elif virtual_qty > 0:
+            return "resupplying"
+        else:
+            return "out_of_stock"
+
+    def _get_stock_states(self):
+        """
+        Compute the stock state of all the products at once: the quantities
+        are computed for the whole recordset and the thresholds are resolved
+        in bulk
+        :return: dict {product id: stock state}
+        """
+        qties = self.mapped("qty_available")
+        virtual_qties = self.mapped("virtual_available")
+        thresholds = self._get_stock_state_thresholds()
+        return {
+            product.id: self._classify_stock_state(
+                qty, virtual_qty, thresholds[product.id]
+            )
+            for product, qty, virtual_qty in zip(self, qties, virtual_qties)
+        }
+
+    def _get_stock_state_thresholds(self):
+        """
+        Get the thresholds of the products: the threshold of the product
+        (or of its category) is stored on the template, the threshold of
+        the current company is used otherwise
+        :return: dict {product id: threshold}
+        """
+        company_threshold = self.env.user.company_id.stock_state_threshold
+        return {
+            product.id: product.stock_state_threshold or company_threshold
+            for product in self
+        }
 
     def _get_stock_state_threshold(self):
         self.ensure_one()
-        threshold = self.stock_state_threshold
-        if not threshold:
-            # try to get threshold from current company
-            threshold = self.env.user.company_id.stock_state_threshold
-        return threshold
+        return self._get_stock_state_thresholds()[self.id]
+
+    @api.multi
+    def _refresh_stored_stock_state(self):
+        """
+        Store the stock state of the products, only the products with a
+        changed state are updated (with one query per state)
+        """
+        to_update = defaultdict(list)
+        for i in range(0, len(self), STOCK_STATE_CHUNK_SIZE):
+            products = self[i : i + STOCK_STATE_CHUNK_SIZE]
+            states = products._get_stock_states()
+            for product in products:
+                if product.stored_stock_state != states[product.id]:
+                    to_update[states[product.id]].append(product.id)
+        for state, product_ids in to_update.items():
+            self.env.cr.execute(
+                """
+                UPDATE product_product
+                SET stored_stock_state = %s
+                WHERE id IN %s
+                """,
+                (state, tuple(product_ids)),
+            )
+        if to_update:
+            self.invalidate_cache(["stored_stock_state"])
+        return True
+
+    @api.model
+    def _cron_refresh_stored_stock_state(self):
+        products = self.search([("type", "=", "product")])
+        return products._refresh_stored_stock_state()
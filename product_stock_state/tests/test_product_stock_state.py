@@ -53,3 +53,19 @@ class TestProductStockState(TransactionCase):
     def test_05_state_out_of_stock(self):
         """Test Stock State computation"""
         self.assertEqual(self.product_by_product.stock_state, "out_of_stock")
+
+    def test_06_refresh_stored_stock_state(self):
+        """Test the stored stock state"""
+        products = self.product_by_product | self.product_by_company
+        products._refresh_stored_stock_state()
+        for product in products:
+            self.assertEqual(product.stored_stock_state, product.stock_state)
+        self.assertEqual(
+            self.env["product.product"].search(
+                [
+                    ("id", "in", products.ids),
+                    ("stored_stock_state", "=", "out_of_stock"),
+                ]
+            ),
+            products.filtered(lambda p: p.stock_state == "out_of_stock"),
+        )
@@ -46,7 +46,4 @@ class ProductProductEventListener(Component):
         :param shopinvader_products: shopinvader.product recordset
         :return: shopinvader.variant recordset
         """
-        shopinv_variants = self.env["shopinvader.variant"].browse()
-        for shopinv_product in shopinvader_products:
-            shopinv_variants |= shopinv_product._create_shopinvader_variant()
-        return shopinv_variants
+        return shopinvader_products._create_shopinvader_variant()
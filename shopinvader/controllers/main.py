@@ -24,20 +24,20 @@ class InvaderController(main.RestController):
         partner_email = headers.get("HTTP_PARTNER_EMAIL")
         backend = cls._get_shopinvader_backend_from_request()
         if partner_email:
-            partner_domain = [
-                ("partner_email", "=", partner_email),
-                ("backend_id", "=", backend.id),
-            ]
-            partner = partner_model.search(partner_domain)
-            if len(partner) == 1:
-                return partner.record_id
+            partner_ids = partner_model._get_record_ids_from_email(
+                backend.id, partner_email
+            )
+            if len(partner_ids) == 1:
+                return request.env["res.partner"].browse(partner_ids)
             else:
                 _logger.warning("Wrong HTTP_PARTNER_EMAIL, header ignored")
-                if len(partner) > 1:
+                if len(partner_ids) > 1:
                     _logger.warning(
                         "More than one shopinvader.partner found for domain:"
                         " %s",
-                        partner_domain,
+                        partner_model._get_email_domain(
+                            backend.id, partner_email
+                        ),
                     )
                 # Could be because the email is not related to a partner or
                 # because the partner is inactive
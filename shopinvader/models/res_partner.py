@@ -77,9 +77,27 @@ class ResPartner(models.Model):
             else:
                 partner.address_type = "profile"
 
+    def _get_shopinvader_email_cache_fields(self):
+        """
+        Fields used to resolve the partner of a request (see
+        shopinvader.partner._get_record_ids_from_email)
+        """
+        return ["email", "active"]
+
+    def _invalidate_shopinvader_email_cache(self, vals=None):
+        fnames = self._get_shopinvader_email_cache_fields()
+        if vals is not None and not any(f in vals for f in fnames):
+            return
+        bindings = self.with_context(active_test=False).mapped(
+            "shopinvader_bind_ids"
+        )
+        if bindings:
+            bindings._invalidate_email_cache()
+
     @api.multi
     def write(self, vals):
         super(ResPartner, self).write(vals)
+        self._invalidate_shopinvader_email_cache(vals)
         if "country_id" in vals:
             carts = self.env["sale.order"].search(
                 [
@@ -94,3 +112,8 @@ class ResPartner(models.Model):
                     {"partner_shipping_id": cart.partner_shipping_id.id}
                 )
         return True
+
+    @api.multi
+    def unlink(self):
+        self._invalidate_shopinvader_email_cache()
+        return super(ResPartner, self).unlink()
@@ -10,6 +10,8 @@ from odoo import api, fields, models
 
 _logger = logging.getLogger(__name__)
 
+REVISION_SEQUENCE = "sale_order_line_shopinvader_revision_seq"
+
 
 class ShopinvaderCartStep(models.Model):
     _name = "shopinvader.cart.step"
@@ -130,6 +132,45 @@ class SaleOrderLine(models.Model):
         compute="_compute_shopinvader_variant",
         string="Shopinvader Variant",
     )
+    shopinvader_revision = fields.Integer(
+        readonly=True,
+        copy=False,
+        default=lambda self: self._next_shopinvader_revision(),
+        help="Technical field changed on each write of the line. It's used "
+        "to reuse the serialization of the line when it is not modified",
+    )
+
+    @api.model_cr
+    def init(self):
+        res = super(SaleOrderLine, self).init()
+        self._cr.execute(
+            "SELECT relname FROM pg_class WHERE relname = %s",
+            (REVISION_SEQUENCE,),
+        )
+        if not self._cr.fetchone():
+            self._cr.execute("CREATE SEQUENCE %s" % REVISION_SEQUENCE)
+        return res
+
+    @api.model
+    def _next_shopinvader_revision(self):
+        # The revision comes from a sequence and not from an increment to
+        # never get the same revision twice, even if a transaction is
+        # rollbacked
+        self._cr.execute("SELECT nextval(%s)", (REVISION_SEQUENCE,))
+        return self._cr.fetchone()[0]
+
+    @api.multi
+    def _write(self, vals):
+        # _write is also used to store the recomputed fields (amounts,...)
+        res = super(SaleOrderLine, self)._write(vals)
+        if self.ids:
+            self._cr.execute(
+                "UPDATE sale_order_line "
+                "SET shopinvader_revision = nextval(%s) WHERE id IN %s",
+                (REVISION_SEQUENCE, tuple(self.ids)),
+            )
+            self.invalidate_cache(["shopinvader_revision"], self.ids)
+        return res
 
     def reset_price_tax(self):
         for line in self:
@@ -3,10 +3,17 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import logging
+
 from odoo import _, api, fields, models, tools
+from odoo.addons.queue_job.job import job
 from odoo.addons.server_environment import serv_config
 from odoo.http import request
 
+_logger = logging.getLogger(__name__)
+
+BIND_CHUNK_SIZE = 500
+
 
 class ShopinvaderBackend(models.Model):
     _name = "shopinvader.backend"
@@ -168,77 +175,254 @@ class ShopinvaderBackend(models.Model):
                 for record in self:
                     record[odoo_field] = result.get(record.id, 0)
 
-    def _bind_all_content(self, model, bind_model, domain):
-        bind_model_obj = self.env[bind_model].with_context(active_test=False)
-        model_obj = self.env[model]
-        records = model_obj.search(domain)
-        binds = bind_model_obj.search(
-            [
-                ("backend_id", "in", self.ids),
-                ("record_id", "in", records.ids),
-                ("lang_id", "in", self.mapped("lang_ids").ids),
-            ]
-        )
+    def _get_bindings_to_update(self, bind_model, record_ids):
+        """
+        Get the missing bindings and the inactive bindings for the given
+        records on the current backends (for each lang of the backends).
+        The existing bindings are read with one query.
+        :param bind_model: str
+        :param record_ids: list of int
+        :return: tuple (list of dict to create, list of binding ids to
+        activate)
+        """
+        table = self.env[bind_model]._table
+        lang_ids = self.mapped("lang_ids").ids
+        existing = {}
+        if record_ids and lang_ids:
+            self.env.cr.execute(
+                "SELECT backend_id, record_id, lang_id, id, active "
+                "FROM %s "
+                "WHERE backend_id IN %%s AND lang_id IN %%s "
+                "AND record_id = ANY(%%s)" % table,
+                (tuple(self.ids), tuple(lang_ids), list(record_ids)),
+            )
+            for backend_id, record_id, lang_id, _id, active in (
+                self.env.cr.fetchall()
+            ):
+                existing[(backend_id, record_id, lang_id)] = (_id, active)
+        to_create = []
+        to_activate = []
         for backend in self:
-            for lang in backend.lang_ids:
-                for record in records:
-                    bind = fields.first(
-                        binds.filtered(
-                            lambda b: b.backend_id == backend
-                            and b.record_id == record
-                            and b.lang_id == lang
-                        )
-                    )
+            for lang_id in backend.lang_ids.ids:
+                for record_id in record_ids:
+                    bind = existing.get((backend.id, record_id, lang_id))
                     if not bind:
-                        bind_model_obj.with_context(map_children=True).create(
+                        to_create.append(
                             {
                                 "backend_id": backend.id,
-                                "record_id": record.id,
-                                "lang_id": lang.id,
+                                "record_id": record_id,
+                                "lang_id": lang_id,
                             }
                         )
-                    elif not bind.active:
-                        bind.write({"active": True})
+                    elif not bind[1]:
+                        to_activate.append(bind[0])
+        return to_create, to_activate
+
+    @api.model
+    def _create_bindings(self, bind_model, values_list):
+        bind_model_obj = self.env[bind_model].with_context(active_test=False)
+        # the urls of the bindings of the chunk are synchronized together
+        deferred_obj = bind_model_obj.with_context(defer_urls_sync=True)
+        binding_ids = []
+        for vals in values_list:
+            binding_ids.append(deferred_obj.create(vals).id)
+        bindings = bind_model_obj.browse(binding_ids)
+        if "is_urls_sync_required" in bindings._fields:
+            bindings._sync_urls()
+        if bind_model == "shopinvader.product":
+            # Create the variants of the whole chunk at once instead of
+            # one product at a time through map_children
+            bindings._create_shopinvader_variant()
+        return bindings
+
+    @api.multi
+    @job(default_channel="root.shopinvader")
+    def _bind_content_chunk(self, bind_model, values_list):
+        bindings = self._create_bindings(bind_model, values_list)
+        self._post_bind_content(bind_model, bindings)
+        return _("%s %s created") % (len(bindings), bind_model)
+
+    def _post_bind_content(self, bind_model, bindings):
+        """
+        Called with the bindings created or activated by _bind_all_content
+        :param bind_model: str
+        :param bindings: recordset of bind_model
+        """
+        if bind_model == "shopinvader.product":
+            self.auto_bind_categories(bindings.mapped("record_id"))
+        return True
+
+    def _bind_all_content(
+        self,
+        model,
+        bind_model,
+        domain,
+        delay=False,
+        chunk_size=None,
+        post_bind=True,
+    ):
+        """
+        Bind (or activate) the records of the model matching the domain
+        on each backend and lang.
+        :param model: str
+        :param bind_model: str
+        :param domain: list
+        :param delay: bool, if True the bindings are created by jobs
+        :param chunk_size: int, number of bindings created by chunk
+        :param post_bind: bool, if False the bindings created or activated
+            without job are not post-processed (see _post_bind_content)
+        :return: bool
+        """
+        chunk_size = chunk_size or BIND_CHUNK_SIZE
+        bind_model_obj = self.env[bind_model].with_context(active_test=False)
+        records = self.env[model].search(domain)
+        to_create, to_activate = self._get_bindings_to_update(
+            bind_model, records.ids
+        )
+        bindings = bind_model_obj.browse(to_activate)
+        if bindings:
+            bindings.write({"active": True})
+        total = len(to_create)
+        for start in range(0, total, chunk_size):
+            values_list = to_create[start : start + chunk_size]
+            if delay:
+                description = _("Bind %s (%s to %s of %s)") % (
+                    bind_model,
+                    start + 1,
+                    start + len(values_list),
+                    total,
+                )
+                self.with_delay(description=description)._bind_content_chunk(
+                    bind_model, values_list
+                )
+            else:
+                bindings |= self._create_bindings(bind_model, values_list)
+                _logger.info(
+                    "%s: %s/%s bindings created",
+                    bind_model,
+                    start + len(values_list),
+                    total,
+                )
+        # With delay, the created bindings are post-processed by the jobs
+        if post_bind and (bindings or not delay):
+            self._post_bind_content(bind_model, bindings)
         return True
 
     @api.multi
     def bind_all_product(self):
-        result = self._bind_all_content(
-            "product.template", "shopinvader.product", [("sale_ok", "=", True)]
+        return self._bind_all_product()
+
+    @api.multi
+    def bind_all_product_delayed(self):
+        return self._bind_all_product(delay=True)
+
+    def _bind_all_product(self, delay=False, chunk_size=None):
+        """
+        Bind all the saleable products
+        :param delay: bool, if True the bindings are created by jobs
+        :param chunk_size: int, number of bindings created by job
+        :return: bool
+        """
+        res = self._bind_all_content(
+            "product.template",
+            "shopinvader.product",
+            [("sale_ok", "=", True)],
+            delay=delay,
+            chunk_size=chunk_size,
+            post_bind=False,
         )
+        # The categories of all the binded products are checked once, not
+        # only the categories of the products binded now. With delay, the
+        # categories of the products binded by the jobs are binded by the
+        # jobs.
         self.auto_bind_categories()
-        return result
+        return res
 
     @api.multi
-    def auto_bind_categories(self):
+    def auto_bind_categories(self, products=None):
         """
         Auto bind product.category for binded shopinvader.product
+        :param products: product recordset (product or template), only bind
+            the categories of these products. If None, the categories of all
+            the products binded on the backends are binded
         :return: bool
         """
         backends = self.filtered(lambda b: b.category_binding_level > 0)
         if not backends:
             return True
-        all_products = self.env["shopinvader.variant"].search(
-            [
-                ("backend_id", "in", backends.ids),
-                # Force to have only active binding
-                ("active", "=", True),
-            ]
-        )
+        if products is not None:
+            categ_ids = products.mapped("categ_id").ids
+            if not categ_ids:
+                return True
         for backend in backends:
-            shopinv_variants = all_products.filtered(
-                lambda p: p.backend_id == backend
-            )
-            products = shopinv_variants.mapped("record_id")
-            categories = backend._get_related_categories(products)
-            if categories:
-                self._bind_all_content(
-                    categories._name,
+            if products is None:
+                categ_ids = backend._get_binded_product_category_ids()
+            category_ids = backend._get_related_category_ids(categ_ids)
+            if category_ids:
+                backend._bind_all_content(
+                    "product.category",
                     "shopinvader.category",
-                    [("id", "in", categories.ids)],
+                    [("id", "in", category_ids)],
                 )
         return True
 
+    def _get_binded_product_category_ids(self):
+        """
+        Get the categories of the products with an active binding on the
+        backend
+        :return: list of product.category ids
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT pt.categ_id
+            FROM shopinvader_variant sv
+            JOIN product_product pp ON pp.id = sv.record_id
+            JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            WHERE sv.backend_id = %s
+            AND sv.active
+            AND pt.categ_id IS NOT NULL
+            """,
+            (self.id,),
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _get_related_category_ids(self, categ_ids):
+        """
+        Get the ids of the product.category to bind for the given categories
+        of products: the categories and their parents until the
+        category binding level of the backend. The parents are found with
+        one query on the parent_left / parent_right of the categories.
+        :param categ_ids: list of product.category ids
+        :return: list of product.category ids
+        """
+        self.ensure_one()
+        if not categ_ids or self.category_binding_level <= 0:
+            return []
+        self.env.cr.execute(
+            """
+            WITH categ AS (
+                SELECT c.id, c.parent_left, (
+                    SELECT count(*) FROM product_category p
+                    WHERE p.parent_left <= c.parent_left
+                    AND p.parent_right > c.parent_left) AS depth
+                FROM product_category c
+                WHERE c.id IN %s
+            )
+            SELECT DISTINCT a.id
+            FROM categ
+            JOIN product_category a
+                ON a.parent_left <= categ.parent_left
+                AND a.parent_right > categ.parent_left
+            WHERE categ.depth - (
+                SELECT count(*) FROM product_category p
+                WHERE p.parent_left <= a.parent_left
+                AND p.parent_right > a.parent_left) < %s
+            """,
+            (tuple(categ_ids), self.category_binding_level),
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
     @api.multi
     def _get_related_categories(self, products):
         """
@@ -248,20 +432,32 @@ class ShopinvaderBackend(models.Model):
         :return: product.category recordset
         """
         self.ensure_one()
-        # As we consume the first level (direct category), minus 1
-        level = self.category_binding_level - 1
-        categories = products.mapped("categ_id")
-        # pull up until the correct level
-        parent_categories = categories
-        while level > 0:
-            parent_categories = parent_categories.mapped("parent_id")
-            categories |= parent_categories
-            level -= 1
-        return categories
+        return self.env["product.category"].browse(
+            self._get_related_category_ids(products.mapped("categ_id").ids)
+        )
 
     @api.multi
     def bind_all_category(self):
-        self._bind_all_content("product.category", "shopinvader.category", [])
+        return self._bind_all_category()
+
+    @api.multi
+    def bind_all_category_delayed(self):
+        return self._bind_all_category(delay=True)
+
+    def _bind_all_category(self, delay=False, chunk_size=None):
+        """
+        Bind all the categories
+        :param delay: bool, if True the bindings are created by jobs
+        :param chunk_size: int, number of bindings created by job
+        :return: bool
+        """
+        return self._bind_all_content(
+            "product.category",
+            "shopinvader.category",
+            [],
+            delay=delay,
+            chunk_size=chunk_size,
+        )
 
     def _send_notification(self, notification, record):
         self.ensure_one()
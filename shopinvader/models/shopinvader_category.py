@@ -3,9 +3,14 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models
 from odoo.addons.base_url.models.abstract_url import get_model_ref
 
+_logger = logging.getLogger(__name__)
+
 
 class ShopinvaderCategory(models.Model):
     _name = "shopinvader.category"
@@ -37,7 +42,14 @@ class ShopinvaderCategory(models.Model):
     shopinvader_child_ids = fields.One2many(
         "shopinvader.category", inverse_name="shopinvader_parent_id"
     )
-    level = fields.Integer(compute="_compute_level")
+    level = fields.Integer(compute="_compute_level", store=True, index=True)
+    shopinvader_path = fields.Char(
+        compute="_compute_level",
+        store=True,
+        index=True,
+        help="Ids of the active shopinvader parents and of the category "
+        "itself (ex: 1/5/12/)",
+    )
     redirect_url_key = fields.Serialized(
         compute="_compute_redirect_url_key", string="Redirect Url Keys"
     )
@@ -56,11 +68,9 @@ class ShopinvaderCategory(models.Model):
         return [(cat.id, cat.record_id.display_name) for cat in self]
 
     def _compute_redirect_url_key(self):
+        url_keys = self._get_redirect_url_keys()
         for record in self:
-            res = []
-            for url in record.redirect_url_url_ids:
-                res.append(url.url_key)
-            record.redirect_url_key = res
+            record.redirect_url_key = url_keys[record.id]
 
     @api.depends("record_id")
     def _compute_object_id(self):
@@ -68,29 +78,147 @@ class ShopinvaderCategory(models.Model):
             record.object_id = record.record_id.id
 
     @api.depends(
-        "parent_id.shopinvader_bind_ids.shopinvader_parent_id",
-        "shopinvader_parent_id.active",
+        "parent_id",
+        "parent_id.shopinvader_bind_ids",
+        "parent_id.shopinvader_bind_ids.active",
     )
     def _compute_parent_category(self):
+        # Only the categories whose parent or parent bindings changed are
+        # recomputed (and not the whole subtree below them)
+        parents = self._get_parent_binding_map()
         for record in self:
-            for binding in record.parent_id.shopinvader_bind_ids:
-                if (
-                    binding.backend_id == record.backend_id
-                    and binding.lang_id == record.lang_id
-                    and binding.active
-                ):
-                    record.shopinvader_parent_id = binding
-                    break
+            binding = parents.get(
+                (record.parent_id.id, record.backend_id.id, record.lang_id.id)
+            )
+            if binding:
+                record.shopinvader_parent_id = binding
+
+    def _get_parent_binding_map(self):
+        """
+        Get the active bindings of the parent categories of the current
+        bindings with one search
+        :return: dict {(record_id, backend_id, lang_id): shopinvader.category}
+        """
+        parent_categs = self.mapped("parent_id")
+        if not parent_categs:
+            return {}
+        bindings = self.search(
+            [
+                ("record_id", "in", parent_categs.ids),
+                ("backend_id", "in", self.mapped("backend_id").ids),
+                ("lang_id", "in", self.mapped("lang_id").ids),
+                ("active", "=", True),
+            ]
+        )
+        res = {}
+        for binding in bindings:
+            key = (
+                binding.record_id.id,
+                binding.backend_id.id,
+                binding.lang_id.id,
+            )
+            res.setdefault(key, binding)
+        return res
+
+    @api.model
+    def _get_ancestor_binding_map(self, categ_ids, backend_id, lang_id):
+        """
+        Get the active bindings of the given categories and of their
+        parents with one query (based on the parent_left / parent_right of
+        the categories)
+        :param categ_ids: list of product.category ids
+        :param backend_id: int
+        :param lang_id: int
+        :return: dict {product.category id: list of shopinvader.category ids}
+        """
+        res = defaultdict(list)
+        if not categ_ids:
+            return res
+        self.env.cr.execute(
+            """
+            SELECT c.id, sc.id
+            FROM product_category c
+            JOIN product_category a
+                ON a.parent_left <= c.parent_left
+                AND a.parent_right > c.parent_left
+            JOIN shopinvader_category sc
+                ON sc.record_id = a.id
+                AND sc.backend_id = %s
+                AND sc.lang_id = %s
+                AND (sc.active OR NOT %s)
+            WHERE c.id IN %s
+            ORDER BY sc.sequence, sc.id
+            """,
+            (
+                backend_id,
+                lang_id,
+                self._context.get("active_test", True),
+                tuple(categ_ids),
+            ),
+        )
+        for categ_id, binding_id in self.env.cr.fetchall():
+            res[categ_id].append(binding_id)
+        return res
+
+    @api.model
+    def _get_leaf_ids(self, binding_ids):
+        """
+        Get the bindings without active children among the given ones
+        :param binding_ids: list of shopinvader.category ids
+        :return: set of shopinvader.category ids
+        """
+        if not binding_ids:
+            return set()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT shopinvader_parent_id
+            FROM shopinvader_category
+            WHERE active AND shopinvader_parent_id IN %s
+            """,
+            (tuple(binding_ids),),
+        )
+        parent_ids = {row[0] for row in self.env.cr.fetchall()}
+        return set(binding_ids) - parent_ids
 
     def _post_process_url_key(self, key):
         key = super(ShopinvaderCategory, self)._post_process_url_key(key)
-        if self.parent_id and self.shopinvader_parent_id.active:
-            if not self.shopinvader_parent_id.automatic_url_key:
-                self.shopinvader_parent_id._compute_automatic_url_key()
-            parent_url = self.shopinvader_parent_id.automatic_url_key
+        parent = self.shopinvader_parent_id
+        if self.parent_id and parent.active:
+            # the keys of the parents computed in the same batch are given
+            # by _post_process_url_keys
+            parent_url_keys = self.env.context.get(
+                "shopinvader_parent_url_keys", {}
+            )
+            if parent.id in parent_url_keys:
+                parent_url = parent_url_keys[parent.id]
+            else:
+                if not parent.automatic_url_key:
+                    parent._compute_automatic_url_key()
+                parent_url = parent.automatic_url_key
             key = "/".join([parent_url, key])
         return key
 
+    def _post_process_url_keys(self, key_by_id):
+        # The keys are built top-down: the key of a parent computed in the
+        # same batch is built once and reused as prefix by its children
+        url_key_by_id = {}
+        records = self.with_context(shopinvader_parent_url_keys=url_key_by_id)
+
+        def process(record):
+            if record.id in url_key_by_id:
+                return
+            parent = record.shopinvader_parent_id
+            if parent.id in key_by_id:
+                process(parent)
+            url_key_by_id[record.id] = record._post_process_url_key(
+                key_by_id[record.id]
+            )
+
+        for record in records:
+            if record.id in key_by_id:
+                process(record)
+        return url_key_by_id
+
     @api.multi
     @api.depends(
         "lang_id", "record_id.name", "shopinvader_parent_id.automatic_url_key"
@@ -101,37 +229,111 @@ class ShopinvaderCategory(models.Model):
     @api.depends(
         "shopinvader_parent_id",
         "shopinvader_parent_id.level",
+        "shopinvader_parent_id.shopinvader_path",
         "shopinvader_parent_id.active",
     )
     def _compute_level(self):
+        # The level and the path are stored: only the parent is read and the
+        # changes are propagated to the children by the ORM
         for record in self:
-            record.level = 0
             parent = record.shopinvader_parent_id
-            while parent and parent.active:
-                record.level += 1
-                parent = parent.shopinvader_parent_id
+            if parent and parent.active:
+                record.level = parent.level + 1
+                path = parent.shopinvader_path or ""
+            else:
+                record.level = 0
+                path = ""
+            if isinstance(record.id, models.NewId):
+                record.shopinvader_path = path
+            else:
+                record.shopinvader_path = "%s%s/" % (path, record.id)
+
+    def _get_sub_category_bindings(self):
+        """
+        Get the active bindings of the sub categories (including the
+        categories themselves) on the backend of the current bindings with
+        one query (based on the parent_left / parent_right of the categories)
+        :return: shopinvader.category recordset
+        """
+        if not self:
+            return self.browse()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT sc.id
+            FROM shopinvader_category b
+            JOIN product_category c ON c.id = b.record_id
+            JOIN product_category child
+                ON child.parent_left >= c.parent_left
+                AND child.parent_left < c.parent_right
+            JOIN shopinvader_category sc
+                ON sc.record_id = child.id
+                AND sc.backend_id = b.backend_id
+                AND sc.active
+            WHERE b.id IN %s
+            """,
+            (tuple(self.ids),),
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
 
     def _unbind(self):
-        shopinvader_child_cat = self.browse()
-        for shopinvader_cat in self:
-            categ_id = shopinvader_cat.record_id
-            childs_cat = self.env["product.category"].search(
-                [("id", "child_of", categ_id.id)]
-            )
-            shopinvader_child_cat = self.search(
-                [
-                    ("record_id", "in", childs_cat.ids),
-                    ("backend_id", "=", shopinvader_cat.backend_id.id),
-                ]
-            )
-        categories = self | shopinvader_child_cat
+        categories = self | self._get_sub_category_bindings()
         categories.write({"active": False})
 
+    def _get_redirect_target_ids(self):
+        """
+        Get the nearest active ancestor binding of each binding, the
+        current bindings excluded (they are unbound together), with one
+        query (based on the parent_left / parent_right of the categories)
+        :return: dict {shopinvader.category id: shopinvader.category id}
+        """
+        if not self:
+            return {}
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT ON (b.id) b.id, sc.id
+            FROM shopinvader_category b
+            JOIN product_category c ON c.id = b.record_id
+            JOIN product_category a
+                ON a.parent_left < c.parent_left
+                AND a.parent_right > c.parent_left
+            JOIN shopinvader_category sc
+                ON sc.record_id = a.id
+                AND sc.backend_id = b.backend_id
+                AND sc.lang_id = b.lang_id
+                AND sc.active
+                AND sc.id NOT IN %s
+            WHERE b.id IN %s
+            ORDER BY b.id, a.parent_left DESC
+            """,
+            (tuple(self.ids), tuple(self.ids)),
+        )
+        return dict(self.env.cr.fetchall())
+
     def _redirect_existing_url(self):
-        for record in self.filtered(lambda c: c.url_url_ids):
-            categ = record.shopinvader_parent_id
-            if categ:
-                record.url_url_ids.write(
-                    {"redirect": True, "model_id": get_model_ref(categ)}
-                )
+        # the urls are redirected with one write per target category: the
+        # nearest ancestor which stays active
+        urls_by_record = self._get_url_urls()
+        target_ids = self._get_redirect_target_ids()
+        url_ids_by_target = defaultdict(list)
+        nb_categs = 0
+        for record in self:
+            target_id = target_ids.get(record.id)
+            urls = urls_by_record[record]
+            if target_id and urls:
+                target = get_model_ref(self.browse(target_id))
+                url_ids_by_target[target] += urls.ids
+                nb_categs += 1
+        url_obj = self.env["url.url"]
+        for target, url_ids in url_ids_by_target.items():
+            url_obj.browse(url_ids).write(
+                {"redirect": True, "model_id": target}
+            )
+        if url_ids_by_target:
+            _logger.info(
+                "%s urls of %s shopinvader categories redirected to %s "
+                "ancestor categories",
+                sum(len(url_ids) for url_ids in url_ids_by_target.values()),
+                nb_categs,
+                len(url_ids_by_target),
+            )
         return True
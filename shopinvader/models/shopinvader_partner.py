@@ -5,6 +5,9 @@
 
 
 from odoo import api, fields, models
+from odoo.addons.base_url.tools import StampedCache
+
+EMAIL_CACHE = StampedCache("shopinvader.partner.email")
 
 
 class ShopinvaderPartner(models.Model):
@@ -33,10 +36,86 @@ class ShopinvaderPartner(models.Model):
         ),
     ]
 
+    @api.model_cr
+    def init(self):
+        res = super(ShopinvaderPartner, self).init()
+        EMAIL_CACHE.init(self._cr)
+        return res
+
     @api.model
     def create(self, vals):
         vals = self._prepare_create_params(vals)
-        return super(ShopinvaderPartner, self).create(vals)
+        res = super(ShopinvaderPartner, self).create(vals)
+        self._invalidate_email_cache()
+        return res
+
+    @api.multi
+    def write(self, vals):
+        res = super(ShopinvaderPartner, self).write(vals)
+        if any(f in vals for f in self._get_email_cache_fields()):
+            self._invalidate_email_cache()
+        return res
+
+    @api.multi
+    def unlink(self):
+        res = super(ShopinvaderPartner, self).unlink()
+        self._invalidate_email_cache()
+        return res
+
+    @api.model
+    def _get_email_domain(self, backend_id, email):
+        return [("partner_email", "=", email), ("backend_id", "=", backend_id)]
+
+    @api.model
+    def _get_record_ids_from_email(self, backend_id, email):
+        """
+        Get the ids of the partners bound to the given backend with the given
+        email. The result is cached by (user, backend, email) and evicted
+        by _invalidate_email_cache.
+        :param backend_id: int
+        :param email: str
+        :return: tuple of res.partner ids
+        """
+        return EMAIL_CACHE.get(
+            self.env.cr,
+            (self._uid, backend_id, email),
+            lambda: self._search_record_ids_from_email(backend_id, email),
+        )
+
+    @api.model
+    def _search_record_ids_from_email(self, backend_id, email):
+        bindings = self.search(self._get_email_domain(backend_id, email))
+        return tuple(binding.record_id.id for binding in bindings)
+
+    def _get_email_cache_fields(self):
+        """
+        Fields of the bindings used by _get_record_ids_from_email (active is
+        added on the bindings by shopinvader_guest_mode)
+        """
+        return [
+            "email",
+            "partner_email",
+            "backend_id",
+            "record_id",
+            "active",
+        ]
+
+    @api.model
+    def _invalidate_email_cache(self):
+        """
+        Evict the cache used by _get_record_ids_from_email in all the
+        workers once the current transaction is committed
+        """
+        EMAIL_CACHE.invalidate(self.env.cr)
+
+    @api.model
+    def _get_email_cache_stats(self):
+        """
+        Get the hit and miss counters of the email cache for the current
+        worker process.
+        :return: dict
+        """
+        return {"hit": EMAIL_CACHE.hit, "miss": EMAIL_CACHE.miss}
 
     @api.model
     def _prepare_create_params(self, vals):
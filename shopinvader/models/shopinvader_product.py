@@ -3,8 +3,15 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models
 
+_logger = logging.getLogger(__name__)
+
+REDIRECT_CHUNK_SIZE = 1000
+
 
 class ShopinvaderProduct(models.Model):
     _name = "shopinvader.product"
@@ -82,20 +89,40 @@ class ShopinvaderProduct(models.Model):
         self.ensure_one()
         return self.categ_id
 
+    def _get_shopinvader_categ_ids(self):
+        """
+        Get the ids of the bindings of the categories of the products and of
+        their parents. They are read once for all the products of a backend
+        and lang.
+        :return: dict {record: list of shopinvader.category ids}
+        """
+        shopinv_categ_obj = self.env["shopinvader.category"]
+        records_by_key = defaultdict(list)
+        categs_by_record = {}
+        for record in self:
+            categs_by_record[record] = record._get_categories()
+            records_by_key[(record.backend_id.id, record.lang_id.id)].append(
+                record
+            )
+        res = {}
+        for (backend_id, lang_id), records in records_by_key.items():
+            categ_ids = set()
+            for record in records:
+                categ_ids.update(categs_by_record[record].ids)
+            ancestors = shopinv_categ_obj._get_ancestor_binding_map(
+                list(categ_ids), backend_id, lang_id
+            )
+            for record in records:
+                ids = []
+                for categ in categs_by_record[record]:
+                    ids += ancestors.get(categ.id, [])
+                res[record] = ids
+        return res
+
     def _compute_shopinvader_category(self):
+        categ_ids_by_record = self._get_shopinvader_categ_ids()
         for record in self:
-            ids = []
-            categs = record._get_categories()
-            for categ in categs:
-                parents = self.env["shopinvader.category"].search(
-                    [
-                        ("record_id", "parent_of", categ.id),
-                        ("backend_id", "=", record.backend_id.id),
-                        ("lang_id", "=", record.lang_id.id),
-                    ]
-                )
-                ids += parents.ids
-            record.shopinvader_categ_ids = ids
+            record.shopinvader_categ_ids = categ_ids_by_record[record]
 
     def _prepare_shopinvader_variant(self, variant):
         values = {"record_id": variant.id, "shopinvader_product_id": self.id}
@@ -107,25 +134,43 @@ class ShopinvaderProduct(models.Model):
     def _get_variants(self):
         return self.product_variant_ids
 
-    def _create_shopinvader_variant(self):
+    def _get_existing_shopinvader_variant_keys(self):
+        """
+        Get the (shopinvader product id, product id) of the existing
+        shopinvader.variant (active or not) with one query
+        :return: set of tuple
+        """
+        if not self.ids:
+            return set()
+        self.env.cr.execute(
+            "SELECT shopinvader_product_id, record_id "
+            "FROM shopinvader_variant WHERE shopinvader_product_id IN %s",
+            (tuple(self.ids),),
+        )
+        return set(self.env.cr.fetchall())
+
+    @api.multi
+    def _create_shopinvader_variant(self, products=None):
         """
         Create missing shopinvader.variant and return new just created
+        :param products: product.product recordset, if given only these
+        variants are bound
         :return: shopinvader.variant recordset
         """
-        self.ensure_one()
         self_ctx = self.with_context(active_test=False)
         shopinv_variant_obj = self_ctx.env["shopinvader.variant"]
-        shopinv_variants = shopinv_variant_obj.browse()
-        for variant in self_ctx._get_variants():
-            if not shopinv_variant_obj.search_count(
-                [
-                    ("record_id", "=", variant.id),
-                    ("shopinvader_product_id", "=", self.id),
-                ]
-            ):
-                vals = self_ctx._prepare_shopinvader_variant(variant)
-                shopinv_variants |= shopinv_variant_obj.create(vals)
-        return shopinv_variants
+        variant_ids = []
+        existing_keys = self._get_existing_shopinvader_variant_keys()
+        product_ids = set(products.ids) if products is not None else None
+        for record in self_ctx:
+            for variant in record._get_variants():
+                if product_ids is not None and variant.id not in product_ids:
+                    continue
+                if (record.id, variant.id) in existing_keys:
+                    continue
+                vals = record._prepare_shopinvader_variant(variant)
+                variant_ids.append(shopinv_variant_obj.create(vals).id)
+        return shopinv_variant_obj.browse(variant_ids)
 
     @api.model
     def create(self, vals):
@@ -174,20 +219,62 @@ class ShopinvaderProduct(models.Model):
     def _redirect_existing_url(self):
         """
         During unbind, we have to redirect existing urls to the (first) related
-        shopinvader category.
+        shopinvader category. The products are processed by chunk and the
+        progress is logged.
         :return: bool
         """
-        for record in self.filtered(lambda p: p.url_url_ids):
-            # Active category without children
-            categs = record.shopinvader_categ_ids.filtered(
-                lambda c: c.active and not c.shopinvader_child_ids
+        total = len(self)
+        for start in range(0, total, REDIRECT_CHUNK_SIZE):
+            self[start : start + REDIRECT_CHUNK_SIZE]._redirect_url_chunk()
+            _logger.info(
+                "Urls of %s/%s shopinvader products redirected",
+                min(start + REDIRECT_CHUNK_SIZE, total),
+                total,
             )
-            if categs:
-                categ = fields.first(categs)
-                record.url_url_ids.write(
-                    {
-                        "redirect": True,
-                        "model_id": "{},{}".format(categ._name, categ.id),
-                    }
-                )
         return True
+
+    def _redirect_url_chunk(self):
+        """
+        Redirect the urls of the products to their first active category
+        without children with one UPDATE
+        """
+        url_obj = self.env["url.url"]
+        categ_obj = self.env["shopinvader.category"].with_context(
+            active_test=True
+        )
+        urls_by_record = self._get_url_urls()
+        records = self.filtered(lambda r: urls_by_record[r])
+        categ_ids_by_record = records.with_context(
+            active_test=True
+        )._get_shopinvader_categ_ids()
+        all_categ_ids = set()
+        for categ_ids in categ_ids_by_record.values():
+            all_categ_ids.update(categ_ids)
+        leaf_ids = categ_obj._get_leaf_ids(list(all_categ_ids))
+        url_ids = []
+        targets = []
+        for record in records:
+            for categ_id in categ_ids_by_record[record]:
+                if categ_id in leaf_ids:
+                    target = "{},{}".format(categ_obj._name, categ_id)
+                    url_ids += urls_by_record[record].ids
+                    targets += [target] * len(urls_by_record[record])
+                    break
+        if not url_ids:
+            return
+        # the categories have the same backend and lang as the products, so
+        # the related fields of the urls don't change
+        self.env.cr.execute(
+            """
+            UPDATE url_url u
+            SET redirect = true,
+                model_id = data.model_id,
+                write_uid = %s,
+                write_date = (now() at time zone 'UTC')
+            FROM unnest(%s, %s) AS data(id, model_id)
+            WHERE u.id = data.id
+            """,
+            (self.env.uid, url_ids, targets),
+        )
+        url_obj.invalidate_cache(["redirect", "model_id"], url_ids)
+        url_obj._invalidate_resolve_url_cache()
@@ -3,6 +3,8 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import api, fields, models
 from odoo.tools import float_compare, float_round
 
@@ -70,30 +72,69 @@ class ShopinvaderVariant(models.Model):
             )
 
     def _compute_price(self):
+        prices = self._get_all_prices()
         for record in self:
-            record.price = record._get_all_price()
+            record.price = prices[record.id]
 
-    def _get_all_price(self):
-        self.ensure_one()
+    def _get_price_configuration(self, backend):
+        """
+        Get the prices to export for the given backend
+        :param backend: shopinvader.backend recordset
+        :return: list of tuple (price key, pricelist, fiscal position)
+        """
+        res = []
+        if backend.pricelist_id:
+            res.append(("default", backend.pricelist_id, None))
+        return res
+
+    @api.model
+    def _price_configuration_changed(self, backends):
+        """
+        Hook called when the price configuration of the backends (see
+        `_get_price_configuration`) has been modified
+        :param backends: shopinvader.backend recordset
+        """
+        return True
+
+    def _get_all_prices(self):
+        """
+        Get the prices of each variant (grouped by backend to compute the
+        prices of all the variants of a backend at once)
+        :return: dict {variant id: {price key: price dict}}
+        """
+        records_by_backend = defaultdict(self.browse)
+        for record in self:
+            records_by_backend[record.backend_id] |= record
         res = {}
-        pricelist = self.backend_id.pricelist_id
-        if pricelist:
-            res["default"] = self._get_price(
-                pricelist, None, self.backend_id.company_id
+        for backend, records in records_by_backend.items():
+            configuration = records._get_price_configuration(backend)
+            matrix = records._get_price_matrix(
+                [(pricelist, fpos) for key, pricelist, fpos in configuration],
+                backend.company_id,
             )
+            for record in records:
+                res[record.id] = {
+                    key: matrix[record.id][(pricelist, fpos)]
+                    for key, pricelist, fpos in configuration
+                }
         return res
 
+    def _get_all_price(self):
+        self.ensure_one()
+        return self._get_all_prices()[self.id]
+
     @api.depends("record_id")
     def _compute_object_id(self):
         for record in self:
             record.object_id = record.record_id.id
 
     def _compute_redirect_url_key(self):
+        # the urls belong to the shopinvader products
+        products = self.mapped("shopinvader_product_id")
+        url_keys = products._get_redirect_url_keys()
         for record in self:
-            res = []
-            for url in record.redirect_url_url_ids:
-                res.append(url.url_key)
-            record.redirect_url_key = res
+            product = record.shopinvader_product_id
+            record.redirect_url_key = url_keys[product.id]
 
     def _compute_variant_attributes(self):
         for record in self:
@@ -108,61 +149,94 @@ class ShopinvaderVariant(models.Model):
         return self._get_price_per_qty(1, pricelist, fposition, company)
 
     def _get_price_per_qty(self, qty, pricelist, fposition, company=None):
-        product_id = self.record_id
-        taxes = product_id.taxes_id.sudo().filtered(
-            lambda r: not company or r.company_id == company
-        )
-        # get the expeced tax to apply from the fiscal position
-        tax_id = fposition.map_tax(taxes, product_id) if fposition else taxes
-        tax_id = tax_id and tax_id[0]
-        product = product_id.with_context(
-            quantity=qty, pricelist=pricelist.id, fiscal_position=fposition
-        )
-        final_price, rule_id = pricelist.get_product_price_rule(
-            product, qty or 1.0, None
-        )
-        tax_included = tax_id.price_include
-        account_tax_obj = self.env["account.tax"]
-        # fix tax on the price
-        value = account_tax_obj._fix_tax_included_price_company(
-            final_price, product.taxes_id, tax_id, company
+        self.ensure_one()
+        matrix = self._get_price_matrix([(pricelist, fposition)], company, qty)
+        return matrix[self.id][(pricelist, fposition)]
+
+    def _get_price_matrix(self, pricelist_fpositions, company=None, qty=1):
+        """
+        Compute the prices of the variants for each given pricelist and
+        fiscal position. The pricelist rules are computed for all the
+        variants at once and the taxes and precisions are fetched only once.
+        :param pricelist_fpositions: list of tuple (pricelist, fposition)
+        :param company: res.company recordset
+        :param qty: float
+        :return: dict {variant id: {(pricelist, fposition): price dict}}
+        """
+        res = defaultdict(dict)
+        fix_price = self.env["account.tax"]._fix_tax_included_price_company
+        decimal_precision_obj = self.env["decimal.precision"]
+        product_precision = decimal_precision_obj.precision_get(
+            "Product Price"
         )
-        res = {
-            "value": value,
-            "tax_included": tax_included,
-            "original_value": value,
-            "discount": 0.0,
-        }
-        if pricelist.discount_policy == "without_discount":
-            sol = self.env["sale.order.line"]
-            new_list_price, currency_id = sol._get_real_price_currency(
-                product, rule_id, qty or 1.0, product.uom_id, pricelist.id
-            )
-            # fix tax on the real price
-            new_list_price = account_tax_obj._fix_tax_included_price_company(
-                new_list_price, product.taxes_id, tax_id, company
-            )
-            product_precision = self.env["decimal.precision"].precision_get(
-                "Product Price"
-            )
-            if (
-                float_compare(
-                    new_list_price, value, precision_digits=product_precision
+        discount_precision = decimal_precision_obj.precision_get("Discount")
+        sol = self.env["sale.order.line"]
+        company_taxes = {}
+        for record in self:
+            taxes = record.record_id.taxes_id
+            if taxes not in company_taxes:
+                company_taxes[taxes] = taxes.sudo().filtered(
+                    lambda r: not company or r.company_id == company
                 )
-                == 0
-            ):
-                # Both prices are equals. Product is wihout discount, avoid
-                # divide by 0 exception
-                return res
-            discount = (new_list_price - value) / new_list_price * 100
-            # apply the right precision on discount
-            dicount_precision = self.env["decimal.precision"].precision_get(
-                "Discount"
+        for pricelist, fposition in pricelist_fpositions:
+            products = self.mapped("record_id").with_context(
+                quantity=qty, pricelist=pricelist.id, fiscal_position=fposition
             )
-            discount = float_round(discount, dicount_precision)
-            res.update(
-                {"original_value": new_list_price, "discount": discount}
+            rules = pricelist._compute_price_rule(
+                [(product, qty or 1.0, None) for product in products]
             )
+            for record in self:
+                product = record.record_id.with_context(
+                    quantity=qty,
+                    pricelist=pricelist.id,
+                    fiscal_position=fposition,
+                )
+                # get the expeced tax to apply from the fiscal position,
+                # the mapping can depend on the product
+                taxes = company_taxes[product.taxes_id]
+                if fposition:
+                    tax_id = fposition.map_tax(taxes, record.record_id)
+                else:
+                    tax_id = taxes
+                tax_id = tax_id and tax_id[0]
+                final_price, rule_id = rules[product.id]
+                # fix tax on the price
+                value = fix_price(
+                    final_price, product.taxes_id, tax_id, company
+                )
+                price = {
+                    "value": value,
+                    "tax_included": tax_id.price_include,
+                    "original_value": value,
+                    "discount": 0.0,
+                }
+                res[record.id][(pricelist, fposition)] = price
+                if pricelist.discount_policy != "without_discount":
+                    continue
+                new_list_price, currency_id = sol._get_real_price_currency(
+                    product, rule_id, qty or 1.0, product.uom_id, pricelist.id
+                )
+                # fix tax on the real price
+                new_list_price = fix_price(
+                    new_list_price, product.taxes_id, tax_id, company
+                )
+                if (
+                    float_compare(
+                        new_list_price,
+                        value,
+                        precision_digits=product_precision,
+                    )
+                    == 0
+                ):
+                    # Both prices are equals. Product is wihout discount,
+                    # avoid divide by 0 exception
+                    continue
+                discount = (new_list_price - value) / new_list_price * 100
+                # apply the right precision on discount
+                discount = float_round(discount, discount_precision)
+                price.update(
+                    {"original_value": new_list_price, "discount": discount}
+                )
         return res
 
     def _compute_main_product(self):
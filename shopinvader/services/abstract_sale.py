@@ -3,7 +3,15 @@
 # Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+from copy import deepcopy
+
 from odoo.addons.component.core import AbstractComponent
+from odoo.tools.lru import LRU
+
+# Serialized lines and products shared by the services of the worker.
+# The keys include the revision of the serialized records so the entries
+# never have to be evicted: a modified record gets a new key.
+_FRAGMENT_CACHE = LRU(8192)
 
 
 class AbstractSaleService(AbstractComponent):
@@ -43,14 +51,68 @@ class AbstractSaleService(AbstractComponent):
     def _is_item(self, line):
         return True
 
+    def _get_fragment_cache_key(self, key):
+        return (
+            self.env.cr.dbname,
+            self._name,
+            self.env.context.get("lang"),
+        ) + key
+
+    def _get_cached_fragment(self, key, builder, *args):
+        """
+        Get the serialized data for the given key from the cache or build it
+        with the builder if the key is unknown
+        :param key: tuple (with the revision of the serialized records)
+        :param builder: method to call (with args) to serialize the data
+        :return: dict (a copy of the cached data)
+        """
+        key = self._get_fragment_cache_key(key)
+        value = _FRAGMENT_CACHE.get(key)
+        if value is None:
+            value = builder(*args)
+            _FRAGMENT_CACHE[key] = value
+        return deepcopy(value)
+
+    def _get_product_cache_key(self, variant):
+        """
+        Key of the serialized product of a line (see _parser_product).
+        The modules adding data from other records to the serialized
+        product must add the revision (ex: write_date) of these records.
+        """
+        return (
+            "product",
+            variant.id,
+            variant.write_date,
+            variant.shopinvader_product_id.write_date,
+            variant.record_id.write_date,
+            variant.product_tmpl_id.write_date,
+        )
+
+    def _get_line_cache_key(self, line):
+        """
+        Key of the serialized line (see _convert_one_line).
+        The modules adding data from other records to the serialized line
+        must add the revision (ex: write_date) of these records.
+        """
+        return (
+            "line",
+            line.id,
+            line.shopinvader_revision,
+            self._get_product_cache_key(line.shopinvader_variant_id),
+        )
+
+    def _convert_line_product(self, line):
+        variant = line.shopinvader_variant_id
+        if not variant:
+            return {}
+        # TODO we should reuse the parser of the index
+        return self._get_cached_fragment(
+            self._get_product_cache_key(variant),
+            lambda: variant.jsonify(self._parser_product())[0],
+        )
+
     def _convert_one_line(self, line):
-        if line.shopinvader_variant_id:
-            # TODO we should reuse the parser of the index
-            product = line.shopinvader_variant_id.jsonify(
-                self._parser_product()
-            )[0]
-        else:
-            product = {}
+        product = self._convert_line_product(line)
         return {
             "id": line.id,
             "product": product,
@@ -69,7 +131,14 @@ class AbstractSaleService(AbstractComponent):
         items = []
         for line in sale.order_line:
             if self._is_item(line):
-                items.append(self._convert_one_line(line))
+                # the serialization of unmodified lines is reused
+                items.append(
+                    self._get_cached_fragment(
+                        self._get_line_cache_key(line),
+                        self._convert_one_line,
+                        line,
+                    )
+                )
         return {
             "items": items,
             "count": sum([item["qty"] for item in items]),
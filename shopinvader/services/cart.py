@@ -62,6 +62,15 @@ class CartService(Component):
         self._delete_item(cart, params)
         return self._to_json(cart)
 
+    def batch_items(self, **params):
+        """Add, update and delete several items in one call.
+           The cart is recomputed and serialized only once"""
+        cart = self._get()
+        if not cart:
+            cart = self._create_empty_cart()
+        self._batch_items(cart, params["items"])
+        return self._to_json(cart)
+
     # Validator
     def _validator_search(self):
         return {}
@@ -126,6 +135,27 @@ class CartService(Component):
             "item_id": {"coerce": to_int, "required": True, "type": "integer"}
         }
 
+    def _validator_batch_items(self):
+        return {
+            "items": {
+                "type": "list",
+                "required": True,
+                "schema": {
+                    "type": "dict",
+                    "schema": {
+                        "action": {
+                            "type": "string",
+                            "required": True,
+                            "allowed": ["add", "update", "delete"],
+                        },
+                        "product_id": {"coerce": to_int, "type": "integer"},
+                        "item_id": {"coerce": to_int, "type": "integer"},
+                        "item_qty": {"coerce": float, "type": "float"},
+                    },
+                },
+            }
+        }
+
     # The following method are 'private' and should be never never NEVER call
     # from the controller.
     # All params are trusted as they have been checked before
@@ -139,9 +169,25 @@ class CartService(Component):
             cart._cache["order_line"] = tuple(real_line_ids)
             vals.update(new_values)
             item.write(vals)
+
+    def _after_items_change(self, cart):
+        """Called once the items of the cart have been added, updated or
+           deleted (once per call, even when several items are changed)"""
         cart.recompute()
 
     def _add_item(self, cart, params):
+        self._do_add_item(cart, params)
+        self._after_items_change(cart)
+
+    def _update_item(self, cart, params, item=False):
+        self._do_update_item(cart, params, item)
+        self._after_items_change(cart)
+
+    def _delete_item(self, cart, params):
+        self._do_delete_item(cart, params)
+        self._after_items_change(cart)
+
+    def _do_add_item(self, cart, params):
         existing_item = self._check_existing_cart_item(cart, params)
         if existing_item:
             qty = existing_item.product_uom_qty + params["item_qty"]
@@ -162,17 +208,50 @@ class CartService(Component):
                 )
                 vals.update(new_values)
                 self.env["sale.order.line"].create(vals)
-            cart.recompute()
+                # the new line must be found if the same product is added
+                # again in the same call
+                cart.invalidate_cache(["order_line"], cart.ids)
 
-    def _update_item(self, cart, params, item=False):
+    def _do_update_item(self, cart, params, item=False):
         if not item:
             item = self._get_cart_item(cart, params)
         self._upgrade_cart_item_quantity(cart, item, params["item_qty"])
 
-    def _delete_item(self, cart, params):
+    def _do_delete_item(self, cart, params):
         item = self._get_cart_item(cart, params)
         item.unlink()
 
+    def _get_batch_item_required_keys(self):
+        return {
+            "add": ["product_id", "item_qty"],
+            "update": ["item_id", "item_qty"],
+            "delete": ["item_id"],
+        }
+
+    def _batch_items(self, cart, items):
+        required_keys = self._get_batch_item_required_keys()
+        for params in items:
+            missing = [
+                key
+                for key in required_keys[params["action"]]
+                if params.get(key) is None
+            ]
+            if missing:
+                raise UserError(
+                    _("Missing keys %s for the action %s")
+                    % (", ".join(missing), params["action"])
+                )
+        with self.env.norecompute():
+            for params in items:
+                action = params["action"]
+                if action == "add":
+                    self._do_add_item(cart, params)
+                elif action == "update":
+                    self._do_update_item(cart, params)
+                elif action == "delete":
+                    self._do_delete_item(cart, params)
+        self._after_items_change(cart)
+
     def _prepare_shipping(self, shipping, params):
         if "address" in shipping:
             address = shipping["address"]
@@ -3,6 +3,8 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import mock
+
 from .common import CommonCase
 
 
@@ -38,3 +40,84 @@ class BackendCase(CommonCase):
         self._bind_all_category()
         self.env["shopinvader.category"].search([], limit=1).unlink()
         self.assertEqual(*self._bind_all_category())
+
+    def test_bind_all_product_delay(self):
+        self._bind_all_product()
+        self.env["shopinvader.product"].search([], limit=2).unlink()
+        self._init_job_counter()
+        self.backend.bind_all_product_delayed()
+        self._check_nbr_job_created(1)
+        self._perform_created_job()
+        self.assertEqual(
+            self.env["product.template"].search_count(
+                [("sale_ok", "=", True)]
+            ),
+            self.env["shopinvader.product"].search_count([]),
+        )
+
+    def test_bind_all_category_delay(self):
+        self._bind_all_category()
+        self.env["shopinvader.category"].search([], limit=2).unlink()
+        self._init_job_counter()
+        self.backend.bind_all_category_delayed()
+        self._check_nbr_job_created(1)
+        self._perform_created_job()
+        self.assertEqual(
+            self.env["product.category"].search_count([]),
+            self.env["shopinvader.category"].search_count([]),
+        )
+
+    def test_bind_all_product_categories_once(self):
+        # the categories are binded once for all the binded products
+        with mock.patch.object(
+            type(self.backend), "auto_bind_categories"
+        ) as mocked:
+            self.backend.bind_all_product()
+            mocked.assert_called_once_with()
+
+    def test_bind_all_product_variants_once(self):
+        # the variants of a chunk are created in one call
+        domain = [("backend_id", "=", self.backend.id)]
+        self.env["shopinvader.product"].search(domain).unlink()
+        product_cls = type(self.env["shopinvader.product"])
+        with mock.patch.object(
+            product_cls,
+            "_create_shopinvader_variant",
+            autospec=True,
+            side_effect=product_cls._create_shopinvader_variant,
+        ) as mocked:
+            self.backend.bind_all_product()
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(
+            self.env["product.product"].search_count(
+                [("sale_ok", "=", True)]
+            )
+            * len(self.backend.lang_ids),
+            self.env["shopinvader.variant"].search_count(domain),
+        )
+
+    def test_bind_all_product_urls_once(self):
+        # the urls of a chunk are synchronized in one call
+        domain = [("backend_id", "=", self.backend.id)]
+        self.env["shopinvader.product"].search(domain).unlink()
+        product_cls = type(self.env["shopinvader.product"])
+        with mock.patch.object(
+            product_cls,
+            "_set_urls",
+            autospec=True,
+            side_effect=product_cls._set_urls,
+        ) as mocked:
+            self.backend.bind_all_product()
+        synced = [call[0][0] for call in mocked.call_args_list if call[0][0]]
+        bindings = self.env["shopinvader.product"].search(domain)
+        self.assertEqual(synced, [bindings])
+        self.assertFalse(any(bindings.mapped("is_urls_sync_required")))
+        for binding in bindings:
+            self.assertEqual(binding.url_url_ids.url_key, binding.url_key)
+
+    def test_reactivate_all_category(self):
+        self._bind_all_category()
+        categ = self.env["shopinvader.category"].search([], limit=1)
+        categ.active = False
+        self._bind_all_category()
+        self.assertTrue(categ.active)
@@ -3,6 +3,9 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from odoo.addons.shopinvader.services.abstract_sale import _FRAGMENT_CACHE
+from odoo.exceptions import UserError
+
 from .common import CommonCase
 
 
@@ -40,6 +43,11 @@ class AbstractItemCase(object):
             self.service.dispatch("delete_item", params={"item_id": item_id})
         )
 
+    def batch_items(self, items):
+        return self.extract_cart(
+            self.service.dispatch("batch_items", params={"items": items})
+        )
+
     def check_product_and_qty(self, line, product_id, qty):
         self.assertEqual(line["product"]["id"], product_id)
         self.assertEqual(line["qty"], qty)
@@ -76,6 +84,53 @@ class AbstractItemCase(object):
         cart = self.update_item(line_id, 5)
         self.check_product_and_qty(cart["lines"]["items"][0], product_id, 5)
 
+    def test_update_item_twice(self):
+        line = self.cart.order_line[0]
+        revision = line.shopinvader_revision
+        cart = self.update_item(line.id, 5)
+        self.assertNotEqual(line.shopinvader_revision, revision)
+        self.assertEqual(cart["lines"]["items"][0]["qty"], 5)
+        # the serialization of the line must not be reused once modified
+        cart = self.update_item(line.id, 6)
+        self.assertEqual(cart["lines"]["items"][0]["qty"], 6)
+
+    def _mark_cached_line(self, line):
+        """
+        Add a marker in the cached serialization of the line to check if
+        the next responses are built from the cache
+        """
+        key = self.service._get_fragment_cache_key(
+            self.service._get_line_cache_key(line)
+        )
+        self.assertIn(key, _FRAGMENT_CACHE)
+        _FRAGMENT_CACHE[key]["from_cache"] = True
+
+    def test_line_served_from_cache(self):
+        line = self.cart.order_line[0]
+        self.service.search()
+        self._mark_cached_line(line)
+        cart = self.service.search()["data"]
+        item = [i for i in cart["lines"]["items"] if i["id"] == line.id][0]
+        self.assertTrue(item.get("from_cache"))
+
+    def test_line_cache_invalidation(self):
+        line = self.cart.order_line[0]
+        self.service.search()
+        self._mark_cached_line(line)
+        # the modification of the product invalidates the line
+        line.shopinvader_variant_id.product_tmpl_id.write(
+            {"name": "New product name"}
+        )
+        cart = self.service.search()["data"]
+        item = [i for i in cart["lines"]["items"] if i["id"] == line.id][0]
+        self.assertNotIn("from_cache", item)
+        # as well as the modification of the line
+        self._mark_cached_line(line)
+        cart = self.update_item(line.id, 5)
+        item = [i for i in cart["lines"]["items"] if i["id"] == line.id][0]
+        self.assertNotIn("from_cache", item)
+        self.assertEqual(item["qty"], 5)
+
     def test_delete_item(self):
         cart = self.service.search()["data"]
         items = cart["lines"]["items"]
@@ -83,6 +138,54 @@ class AbstractItemCase(object):
         cart = self.delete_item(items[0]["id"])
         self.assertEqual(len(cart["lines"]["items"]), nbr_line - 1)
 
+    def test_batch_items(self):
+        cart = self.service.search()["data"]
+        items = cart["lines"]["items"]
+        nbr_line = len(items)
+        cart = self.batch_items(
+            [
+                {
+                    "action": "add",
+                    "product_id": self.product_1.id,
+                    "item_qty": 1,
+                },
+                {
+                    "action": "add",
+                    "product_id": self.product_2.id,
+                    "item_qty": 1,
+                },
+                {
+                    "action": "add",
+                    "product_id": self.product_1.id,
+                    "item_qty": 2,
+                },
+                {"action": "update", "item_id": items[0]["id"], "item_qty": 7},
+                {"action": "delete", "item_id": items[1]["id"]},
+            ]
+        )
+        self.assertEqual(cart["id"], self.cart.id)
+        lines = {line["id"]: line for line in cart["lines"]["items"]}
+        self.assertEqual(len(lines), nbr_line + 1)
+        self.assertNotIn(items[1]["id"], lines)
+        self.assertEqual(lines[items[0]["id"]]["qty"], 7)
+        qty_by_product = {
+            line["product"]["id"]: line["qty"] for line in lines.values()
+        }
+        self.assertEqual(qty_by_product[self.product_1.id], 3)
+        self.assertEqual(qty_by_product[self.product_2.id], 1)
+        self.check_partner(cart)
+
+    def test_batch_items_missing_key(self):
+        with self.assertRaises(UserError):
+            self.service.dispatch(
+                "batch_items",
+                params={
+                    "items": [
+                        {"action": "add", "product_id": self.product_1.id}
+                    ]
+                },
+            )
+
     def test_add_item_with_same_product_without_cart(self):
         self.remove_cart()
         cart = self.add_item(self.product_1.id, 1)
@@ -3,6 +3,7 @@
 # @author Benoît GUILLOT <benoit.guillot@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import mock
 
 from .common import ProductCommonCase
 
@@ -20,6 +21,19 @@ class ProductCase(ProductCommonCase):
             len(self.shopinvader_variants),
         )
 
+    def test_create_shopinvader_variant_multi(self):
+        shopinvader_products = self.shopinvader_variants.mapped(
+            "shopinvader_product_id"
+        )
+        shopinvader_products |= self.env["shopinvader.product"].search(
+            [("backend_id", "=", self.backend.id)], limit=5
+        )
+        # all the variants already exist
+        self.assertFalse(shopinvader_products._create_shopinvader_variant())
+        self.shopinvader_variant.unlink()
+        variants = shopinvader_products._create_shopinvader_variant()
+        self.assertEqual(variants.mapped("record_id"), self.variant)
+
     # TODO MIGRATE
     #    def test_categories(self):
     #        self.assertEqual(
@@ -82,6 +96,62 @@ class ProductCase(ProductCommonCase):
             },
         )
 
+    def test_product_get_price_matrix(self):
+        base_price_list = self.env.ref("product.list0")
+        promotion_price_list = self.env.ref("shopinvader.pricelist_1")
+        fiscal_position_fr = self.env.ref("shopinvader.fiscal_position_0")
+        tax_exclude_fiscal_position = self.env.ref(
+            "shopinvader.fiscal_position_1"
+        )
+        keys = [
+            (base_price_list, fiscal_position_fr),
+            (promotion_price_list, fiscal_position_fr),
+            (promotion_price_list, None),
+            (promotion_price_list, tax_exclude_fiscal_position),
+        ]
+        matrix = self.shopinvader_variants._get_price_matrix(keys)
+        expected = {
+            keys[0]: (750.0, True),
+            keys[1]: (600.0, True),
+            keys[2]: (600.0, True),
+            keys[3]: (521.74, False),
+        }
+        for key, (value, tax_included) in expected.items():
+            self.assertDictEqual(
+                matrix[self.shopinvader_variant.id][key],
+                {
+                    "discount": 0.0,
+                    "original_value": value,
+                    "tax_included": tax_included,
+                    "value": value,
+                },
+            )
+        # promotion price list define a discount of 20% on all product
+        for variant in self.shopinvader_variants:
+            prices = matrix[variant.id]
+            self.assertAlmostEqual(
+                prices[keys[1]]["value"],
+                prices[keys[0]]["value"] * 0.8,
+                places=2,
+            )
+
+    def test_product_get_price_matrix_map_tax(self):
+        # the taxes are mapped with the product of each variant
+        fiscal_position = self.env.ref("shopinvader.fiscal_position_1")
+        with mock.patch.object(
+            type(fiscal_position),
+            "map_tax",
+            autospec=True,
+            side_effect=type(fiscal_position).map_tax,
+        ) as mocked:
+            self.shopinvader_variants._get_price_matrix(
+                [(self.env.ref("product.list0"), fiscal_position)]
+            )
+        self.assertEqual(
+            set(call[0][2] for call in mocked.call_args_list),
+            set(self.shopinvader_variants.mapped("record_id")),
+        )
+
     def test_product_get_price(self):
         # base_price_list doesn't define a tax mapping. We are tax included
         base_price_list = self.env.ref("product.list0")
@@ -234,6 +304,140 @@ class ProductCase(ProductCommonCase):
             elif binding.lang_id.code == "en_US":
                 self.assertEqual(binding.url_key, u"all/saleable")
 
+    def test_category_url_key_rename_parent(self):
+        self.backend.bind_all_category()
+        categ = self.env.ref("product.product_category_1")
+        shopinvader_categ = categ.shopinvader_bind_ids
+        self.assertEqual(shopinvader_categ.url_key, u"all/saleable")
+        categ.parent_id.name = "Everything"
+        self.assertEqual(shopinvader_categ.url_key, u"everything/saleable")
+        for child in shopinvader_categ.shopinvader_child_ids:
+            self.assertTrue(
+                child.automatic_url_key.startswith(u"everything/saleable/")
+            )
+
+    def test_category_url_key_post_process_override(self):
+        self.backend.bind_all_category()
+        categ = self.env.ref("product.product_category_1")
+        shopinvader_categ = categ.shopinvader_bind_ids
+        childs = shopinvader_categ.shopinvader_child_ids
+        category_class = type(shopinvader_categ)
+        post_process_url_key = category_class._post_process_url_key
+
+        def custom_post_process_url_key(record, key):
+            return post_process_url_key(record, key) + "-custom"
+
+        # an override of the per record hook is applied in the batch path
+        with mock.patch.object(
+            category_class,
+            "_post_process_url_key",
+            autospec=True,
+            side_effect=custom_post_process_url_key,
+        ) as mocked:
+            categ.parent_id.name = "Everything"
+            self.assertEqual(
+                shopinvader_categ.url_key, u"everything-custom/saleable-custom"
+            )
+            for child in childs:
+                self.assertTrue(
+                    child.automatic_url_key.startswith(
+                        u"everything-custom/saleable-custom/"
+                    )
+                )
+                self.assertTrue(child.automatic_url_key.endswith(u"-custom"))
+        called = self.env["shopinvader.category"].browse(
+            [call[0][0].id for call in mocked.call_args_list]
+        )
+        self.assertIn(shopinvader_categ, called)
+        self.assertEqual(childs & called, childs)
+
+    def test_category_level_and_path(self):
+        self.backend.bind_all_category()
+        categ = self.env.ref("product.product_category_1")
+        shopinvader_categ = categ.shopinvader_bind_ids
+        parent = shopinvader_categ.shopinvader_parent_id
+        self.assertEqual(parent.level, 0)
+        self.assertEqual(parent.shopinvader_path, "%s/" % parent.id)
+        self.assertEqual(shopinvader_categ.level, 1)
+        self.assertEqual(
+            shopinvader_categ.shopinvader_path,
+            "%s/%s/" % (parent.id, shopinvader_categ.id),
+        )
+        childs = shopinvader_categ.shopinvader_child_ids
+        for child in childs:
+            self.assertEqual(child.level, 2)
+            self.assertTrue(
+                child.shopinvader_path.startswith(
+                    shopinvader_categ.shopinvader_path
+                )
+            )
+        # the stored values are updated when a parent is disabled
+        parent.active = False
+        self.assertEqual(shopinvader_categ.level, 0)
+        self.assertEqual(
+            shopinvader_categ.shopinvader_path, "%s/" % shopinvader_categ.id
+        )
+        self.assertEqual(set(childs.mapped("level")), {1})
+        self.assertEqual(
+            self.env["shopinvader.category"].search(
+                [("shopinvader_path", "=like", "%s/%%" % parent.id)]
+            ),
+            parent,
+        )
+
+    def test_redirect_url_key_query_count(self):
+        """
+        The redirect url keys of the exported bindings are read with one
+        grouped query: the number of queries doesn't depend on the number of
+        bindings
+        """
+        self.backend.bind_all_product()
+        self.backend.bind_all_category()
+        product = self.shopinvader_variant.shopinvader_product_id
+        self.env["url.url"].create(
+            {
+                "url_key": "old-product-key",
+                "redirect": True,
+                "model_id": "{},{}".format(product._name, product.id),
+            }
+        )
+        variants = self.env["shopinvader.variant"].search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        categs = self.env["shopinvader.category"].search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertGreater(len(variants), 10)
+
+        def count_queries(records):
+            records = records.with_prefetch()
+            records.invalidate_cache()
+            count = self.env.cr.sql_log_count
+            records.mapped("redirect_url_key")
+            return self.env.cr.sql_log_count - count
+
+        self.assertEqual(count_queries(variants[0]), count_queries(variants))
+        self.assertEqual(count_queries(categs[0]), count_queries(categs))
+        # only the redirect urls are returned, not the current url
+        self.assertEqual(
+            self.shopinvader_variant.redirect_url_key, ["old-product-key"]
+        )
+        self.assertNotIn(
+            self.shopinvader_variant.url_key,
+            self.shopinvader_variant.redirect_url_key,
+        )
+        for variant in variants - product.shopinvader_variant_ids:
+            self.assertEqual(variant.redirect_url_key, [])
+        # the redirect urls of a category
+        categ = categs[0]
+        old_url = categ.url_url_ids.filtered(lambda u: not u.redirect)
+        categ.write({"url_builder": "manual", "manual_url_key": "new-key"})
+        categs.invalidate_cache()
+        self.assertEqual(categ.url_key, "new-key")
+        self.assertEqual(categ.redirect_url_key, [old_url.url_key])
+        for other_categ in categs - categ:
+            self.assertEqual(other_categ.redirect_url_key, [])
+
     def test_product_category_with_one_lang(self):
         self.backend.bind_all_product()
         self.backend.bind_all_category()
@@ -576,6 +780,45 @@ class ProductCase(ProductCommonCase):
         self.assertIn(categ_child, binded_categs)
         self.assertNotIn(categ_grand_parent, binded_categs)
 
+    def test_product_category_auto_bind_delta(self):
+        """
+        Only the categories of the given products (and their parents until
+        the binding level) are binded
+        """
+        categ_obj = self.env["product.category"]
+        shopinv_categ_obj = self.env["shopinvader.category"]
+        categ_grand_parent = categ_obj.create({"name": "Cool grand-parent"})
+        categ_parent = categ_obj.create(
+            {"name": "Strict parent", "parent_id": categ_grand_parent.id}
+        )
+        categ_child = categ_obj.create(
+            {"name": "normal child", "parent_id": categ_parent.id}
+        )
+        categ_other = categ_obj.create({"name": "Other"})
+        product = self.env.ref("product.product_product_4").copy(
+            {"categ_id": categ_child.id}
+        )
+        self.env.ref("product.product_product_5").copy(
+            {"categ_id": categ_other.id}
+        )
+        self.backend.write({"category_binding_level": 1})
+        self.assertEqual(
+            self.backend._get_related_categories(product), categ_child
+        )
+        self.backend.write({"category_binding_level": 2})
+        self.assertEqual(
+            self.backend._get_related_categories(product),
+            categ_child | categ_parent,
+        )
+        self.backend.auto_bind_categories(product)
+        binded_categs = shopinv_categ_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        ).mapped("record_id")
+        self.assertIn(categ_child, binded_categs)
+        self.assertIn(categ_parent, binded_categs)
+        self.assertNotIn(categ_grand_parent, binded_categs)
+        self.assertNotIn(categ_other, binded_categs)
+
     def test_product_category_auto_bind_wizard(self):
         """
         Test if after a product binding, the category is automatically binded
@@ -751,3 +994,100 @@ class ProductCase(ProductCommonCase):
         bind_product.write({"active": True})
         self.assertEqual(urls.mapped("model_id"), bind_product)
         self.assertFalse(bind_product.is_urls_sync_required)
+
+    def _bind_new_products(self, categ, count=1):
+        product_tmpls = self.env["product.template"].browse()
+        for idx in range(count):
+            product_tmpls |= self.env["product.template"].create(
+                {"name": "Shopinvader Rocket %s" % idx, "categ_id": categ.id}
+            )
+        product_wizard = self.env["shopinvader.variant.binding.wizard"].create(
+            {
+                "backend_id": self.backend.id,
+                "product_ids": [
+                    (6, 0, product_tmpls.mapped("product_variant_ids").ids)
+                ],
+            }
+        )
+        product_wizard.bind_products()
+        return self.env["shopinvader.product"].search(
+            [
+                ("record_id", "in", product_tmpls.ids),
+                ("backend_id", "=", self.backend.id),
+            ]
+        )
+
+    def test_product_url_redirect_to_leaf(self):
+        """
+        The urls of a product with several categories are redirected to the
+        category without children, not to its parents
+        """
+        self.backend.bind_all_category()
+        leaf = self.env["product.category"].search(
+            [("child_id", "=", False), ("parent_id.parent_id", "!=", False)],
+            limit=1,
+        )
+        bind_product = self._bind_new_products(leaf)
+        bind_leaf = leaf.shopinvader_bind_ids
+        self.assertGreater(len(bind_product.shopinvader_categ_ids), 2)
+        self.assertIn(bind_leaf, bind_product.shopinvader_categ_ids)
+        urls = bind_product.url_url_ids
+        lang = bind_product.lang_id
+        # the resolution of the url is cached before the unbind
+        url_obj = self.env["url.url"]
+        self.assertEqual(
+            url_obj.resolve_url(self.backend, lang, urls.url_key),
+            (bind_product, False),
+        )
+        bind_product.write({"active": False})
+        self.assertEqual(urls.mapped("model_id"), bind_leaf)
+        self.assertTrue(urls.redirect)
+        self.assertEqual(
+            url_obj.resolve_url(self.backend, lang, urls.url_key),
+            (bind_leaf, True),
+        )
+
+    def test_product_url_redirect_without_category(self):
+        """
+        The urls of a product without bound category are not redirected
+        """
+        self.backend.bind_all_category()
+        # the category of the product is not bound with the product
+        self.backend.category_binding_level = 0
+        categ = self.env["product.category"].create({"name": "Not Bound"})
+        bind_product = self._bind_new_products(categ)
+        self.assertFalse(bind_product.shopinvader_categ_ids)
+        urls = bind_product.url_url_ids
+        bind_product.write({"active": False})
+        self.assertEqual(urls.mapped("model_id"), bind_product)
+        self.assertFalse(urls.redirect)
+
+    def test_product_url_redirect_chunk(self):
+        """
+        The products are redirected by chunk and the products at the chunk
+        boundary are all redirected
+        """
+        self.backend.bind_all_category()
+        leaf = self.env["product.category"].search(
+            [("child_id", "=", False), ("parent_id", "!=", False)], limit=1
+        )
+        bind_products = self._bind_new_products(leaf, count=3)
+        product_class = type(bind_products)
+        with mock.patch(
+            "odoo.addons.shopinvader.models.shopinvader_product."
+            "REDIRECT_CHUNK_SIZE",
+            2,
+        ), mock.patch.object(
+            product_class,
+            "_redirect_url_chunk",
+            autospec=True,
+            side_effect=product_class._redirect_url_chunk,
+        ) as mocked:
+            bind_products.write({"active": False})
+        chunks = [call[0][0] for call in mocked.call_args_list]
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(chunks[0] | chunks[1], bind_products)
+        urls = bind_products.mapped("url_url_ids")
+        self.assertEqual(len(urls), 3)
+        self.assertEqual(urls.mapped("model_id"), leaf.shopinvader_bind_ids)
+        self.assertTrue(all(urls.mapped("redirect")))
@@ -352,3 +352,67 @@ class TestShopinvaderCategoryBindingWizard(SavepointComponentCase):
         bind_record = category_bind_model.search(domain)
 
         self.assertEqual(len(bind_record), 0)
+
+    def test_multi_unbind(self):
+        """
+        Unbind several categories at once: the sub categories of all the
+        unbound categories must be unbound
+        """
+        cat_obj = self.env["product.category"]
+        other_root = cat_obj.create({"name": "Other Root"})
+        other_cat = cat_obj.create(
+            {"name": "Other Category", "parent_id": other_root.id}
+        )
+        other_child = cat_obj.create(
+            {"name": "Other Child", "parent_id": other_cat.id}
+        )
+        bind_wizard = self.bind_wizard_model.create(
+            {
+                "backend_id": self.backend.id,
+                "child_autobinding": True,
+                "product_category_ids": [
+                    (6, 0, (self.cat_level1 | other_root).ids)
+                ],
+            }
+        )
+        bind_wizard.action_bind_categories()
+        categs = self.cat_level1 | self.cat_level3 | other_cat | other_child
+        domain = [
+            ("record_id", "in", categs.ids),
+            ("backend_id", "=", self.backend.id),
+        ]
+        self.assertEqual(len(self.category_bind_model.search(domain)), 4)
+        parents = self.category_bind_model.search(
+            [
+                ("record_id", "in", (self.cat_level1 | other_cat).ids),
+                ("backend_id", "=", self.backend.id),
+            ]
+        )
+
+        def get_binding(categ):
+            return self.category_bind_model.search(
+                [
+                    ("record_id", "=", categ.id),
+                    ("backend_id", "=", self.backend.id),
+                ]
+            )
+
+        root_binding = get_binding(other_root)
+        level3_binding = get_binding(self.cat_level3)
+        child_url = get_binding(other_child).url_url_ids
+        level3_url = level3_binding.url_url_ids
+        self.assertEqual(len(child_url), 1)
+        self.assertFalse(child_url.redirect)
+        unbind_wizard = self.unbind_wizard_model.create(
+            {"shopinvader_category_ids": [(6, 0, parents.ids)]}
+        )
+        unbind_wizard.action_unbind_categories()
+        self.assertFalse(self.category_bind_model.search(domain))
+        # the url of the child is redirected to its nearest ancestor which
+        # stays active, not to its parent unbound in the same write
+        self.assertTrue(child_url.redirect)
+        self.assertEqual(child_url.model_id, root_binding)
+        self.assertTrue(root_binding.active)
+        # no ancestor of the category stays active
+        self.assertFalse(level3_url.redirect)
+        self.assertEqual(level3_url.model_id, level3_binding)
@@ -4,9 +4,12 @@
 
 from datetime import datetime
 
+import mock
 from odoo.addons.component.tests.common import SavepointComponentCase
 from psycopg2 import IntegrityError
 
+from ..models.shopinvader_partner import EMAIL_CACHE
+
 
 class TestShopinvaderPartner(SavepointComponentCase):
     @classmethod
@@ -137,3 +140,123 @@ class TestShopinvaderPartner(SavepointComponentCase):
             [("email", "=", self.unique_email)]
         )
         self.assertEqual(len(res), 1)
+
+    def _commit_email_cache(self):
+        # simulate the commit of the transaction and a new request
+        EMAIL_CACHE.bump(self.env.cr)
+        EMAIL_CACHE.reset(self.env.cr)
+
+    def _create_email_binding(self):
+        binding = self.env["shopinvader.partner"].create(
+            {
+                "email": self.unique_email,
+                "name": "test  partner",
+                "backend_id": self.backend.id,
+            }
+        )
+        self._commit_email_cache()
+        return binding
+
+    def test_email_cache(self):
+        """
+        Check that the partner resolved from the email is cached and that a
+        hit costs no query
+        """
+        binding_model = self.env["shopinvader.partner"]
+        binding = self._create_email_binding()
+        stats = binding_model._get_email_cache_stats()
+        partner_ids = binding_model._get_record_ids_from_email(
+            self.backend.id, self.unique_email
+        )
+        self.assertEqual(partner_ids, (binding.record_id.id,))
+        query_count = self.env.cr.sql_log_count
+        self.assertEqual(
+            binding_model._get_record_ids_from_email(
+                self.backend.id, self.unique_email
+            ),
+            partner_ids,
+        )
+        self.assertEqual(self.env.cr.sql_log_count, query_count)
+        new_stats = binding_model._get_email_cache_stats()
+        self.assertEqual(new_stats["miss"], stats["miss"] + 1)
+        self.assertEqual(new_stats["hit"], stats["hit"] + 1)
+
+    def test_email_cache_invalidation(self):
+        """
+        The changes of the bindings and of the emails of the partners evict
+        the cache, the other changes keep it
+        """
+        binding = self._create_email_binding()
+        with mock.patch.object(EMAIL_CACHE, "invalidate") as invalidate:
+            binding.record_id.write({"name": "new name"})
+            self.assertFalse(invalidate.called)
+            binding.record_id.write({"email": "new" + self.unique_email})
+            self.assertEqual(invalidate.call_count, 1)
+            binding.record_id.write({"active": False})
+            self.assertEqual(invalidate.call_count, 2)
+            binding.unlink()
+            self.assertEqual(invalidate.call_count, 3)
+
+    def test_email_cache_uncommitted(self):
+        """
+        The cursor with uncommitted changes doesn't use the cache and the
+        entries are evicted once the changes are committed
+        """
+        binding_model = self.env["shopinvader.partner"]
+        binding = self._create_email_binding()
+        new_email = "new" + self.unique_email
+        for email in (self.unique_email, new_email):
+            binding_model._get_record_ids_from_email(self.backend.id, email)
+        binding.record_id.write({"email": new_email})
+        for _idx in range(2):
+            self.assertFalse(
+                binding_model._get_record_ids_from_email(
+                    self.backend.id, self.unique_email
+                )
+            )
+            self.assertEqual(
+                binding_model._get_record_ids_from_email(
+                    self.backend.id, new_email
+                ),
+                (binding.record_id.id,),
+            )
+            self._commit_email_cache()
+
+    def test_email_cache_other_worker(self):
+        """
+        The changes committed by another worker evict the cache
+        """
+        binding_model = self.env["shopinvader.partner"]
+        binding = self._create_email_binding()
+        partner = binding.record_id
+        partner_ids = (partner.id,)
+        other_backend = self.env.ref("shopinvader.backend_2")
+
+        def update(table, query, *params):
+            # simulate a change committed by another worker
+            record = binding if table == "shopinvader_partner" else partner
+            self.env.cr.execute(
+                "UPDATE %s SET %s WHERE id = %%s" % (table, query),
+                params + (record.id,),
+            )
+            self._commit_email_cache()
+
+        def resolve():
+            return binding_model._get_record_ids_from_email(
+                self.backend.id, self.unique_email
+            )
+
+        self.assertEqual(resolve(), partner_ids)
+        update("res_partner", "active = false")
+        self.assertFalse(resolve())
+        update("res_partner", "active = true")
+        self.assertEqual(resolve(), partner_ids)
+        update("shopinvader_partner", "backend_id = %s", other_backend.id)
+        self.assertFalse(resolve())
+        update("shopinvader_partner", "backend_id = %s", self.backend.id)
+        self.assertEqual(resolve(), partner_ids)
+        self.env.cr.execute(
+            "DELETE FROM shopinvader_partner WHERE id = %s", (binding.id,)
+        )
+        self._commit_email_cache()
+        self.assertFalse(resolve())
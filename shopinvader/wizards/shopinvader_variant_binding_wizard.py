@@ -70,23 +70,22 @@ class ShopinvaderVariantBindingWizard(models.TransientModel):
     def bind_products(self):
         for wizard in self:
             binded_templates = wizard._get_binded_templates()
-            binding = self.env["shopinvader.variant"]
-            for product in wizard.product_ids:
-                binded_products = binded_templates[product.product_tmpl_id]
-                for shopinvader_product in binded_products.values():
-                    binded_variants = (
-                        shopinvader_product.shopinvader_variant_ids
-                    )
-                    bind_record = binded_variants.filtered(
-                        lambda p: p.record_id == product
-                    )
-                    if not bind_record:
-                        data = {
-                            "record_id": product.id,
-                            "backend_id": wizard.backend_id.id,
-                            "shopinvader_product_id": shopinvader_product.id,
-                        }
-                        binding.create(data)
-                    elif not bind_record.active:
-                        bind_record.write({"active": True})
-            wizard.backend_id.auto_bind_categories()
+            shopinvader_products = self.env["shopinvader.product"].browse()
+            for bind_records in binded_templates.values():
+                for shopinvader_product in bind_records.values():
+                    shopinvader_products |= shopinvader_product
+            # Reactivate the existing variants and create the missing ones
+            self.env["shopinvader.variant"].search(
+                [
+                    ("shopinvader_product_id", "in", shopinvader_products.ids),
+                    ("record_id", "in", wizard.product_ids.ids),
+                    ("active", "=", False),
+                ]
+            ).write({"active": True})
+            variants = shopinvader_products._create_shopinvader_variant(
+                wizard.product_ids
+            )
+            # The products explicitly selected are always bound as active,
+            # even if the product itself is archived
+            variants.filtered(lambda v: not v.active).write({"active": True})
+            wizard.backend_id.auto_bind_categories(wizard.product_ids)
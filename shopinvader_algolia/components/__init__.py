@@ -2,3 +2,4 @@
 
 from . import exporter
 from . import deleter
+from . import adapter
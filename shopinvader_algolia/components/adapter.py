@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# © 2016 Akretion (http://www.akretion.com)
+# Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+
+from odoo.addons.component.core import Component
+from odoo.addons.connector_algolia.components.adapter import AlgoliaAdapter
+
+
+class ShopinvaderAlgoliaAdapter(Component):
+    _inherit = AlgoliaAdapter._name
+
+    def partial_update(self, datas):
+        """
+        Update only the given attributes of the objects
+        :param datas: list of dict with the objectID and the attributes
+        """
+        index = self._get_index()
+        index.partial_update_objects(datas)
@@ -4,7 +4,7 @@
 
 {
     "name": "Shopinvader Assortment",
-    "version": "10.0.1.0.1",
+    "version": "10.0.1.1.0",
     "license": "AGPL-3",
     "author": "ACSONE SA/NV",
     "website": "http://acsone.eu",
@@ -13,6 +13,6 @@
         "shopinvader",
         "shopinvader_search_engine",
     ],
-    "data": ["views/shopinvader_backend.xml"],
+    "data": ["views/shopinvader_backend.xml", "data/ir_cron.xml"],
     "demo": ["demo/shopinvader_assortment_demo.xml"],
 }
@@ -1,2 +1,5 @@
 from . import shopinvader_backend
-from . import se_index
+from . import product_product
+from . import product_template
+from . import product_category
+from . import ir_filters
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class IrFilters(models.Model):
+
+    _inherit = "ir.filters"
+
+    @api.multi
+    def write(self, vals):
+        res = super(IrFilters, self).write(vals)
+        assortments = self.filtered("is_assortment")
+        if assortments:
+            # the whole assortment must be checked again
+            backends = self.env[
+                "shopinvader.backend"
+            ]._get_assortment_backends()
+            for backend in backends.filtered(
+                lambda b: b.product_assortment_id in assortments
+            ):
+                backend._autobind_product_from_assortment(delay=True)
+        return res
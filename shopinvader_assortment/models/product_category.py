@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductCategory(models.Model):
+
+    _inherit = "product.category"
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductCategory, self).write(vals)
+        # the assortment domains can use the fields of the categories
+        # (ie categ_id.name)
+        self.env["shopinvader.backend"]._update_assortment_records(
+            self, set(vals)
+        )
+        return res
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductProduct(models.Model):
+
+    _inherit = "product.product"
+
+    @api.model
+    def create(self, vals):
+        record = super(ProductProduct, self).create(vals)
+        self.env["shopinvader.backend"]._update_assortment_records(record)
+        return record
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductProduct, self).write(vals)
+        self.env["shopinvader.backend"]._update_assortment_records(
+            self, set(vals)
+        )
+        return res
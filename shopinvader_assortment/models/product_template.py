@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductTemplate(models.Model):
+
+    _inherit = "product.template"
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductTemplate, self).write(vals)
+        products = self.with_context(active_test=False).mapped(
+            "product_variant_ids"
+        )
+        self.env["shopinvader.backend"]._update_assortment_records(
+            products, set(vals)
+        )
+        return res
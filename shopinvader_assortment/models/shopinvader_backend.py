@@ -2,9 +2,14 @@
 # Copyright 2018 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import api, fields, models
+from collections import defaultdict
+
+from odoo import _, api, fields, models
+from odoo.addons.queue_job.job import identity_exact, job
 from odoo.osv import expression
 
+ASSORTMENT_CHUNK_SIZE = 1000
+
 
 class ShopinvaderBackend(models.Model):
 
@@ -19,42 +24,177 @@ class ShopinvaderBackend(models.Model):
         context={"product_assortment": True},
     )
 
-    @api.multi
-    def _autobind_product_from_assortment(self):
+    def _get_assortment_query(self):
+        """
+        Get the SQL query of the products of the assortment
+        :return: tuple (from clause, where clause, params)
+        """
         self.ensure_one()
         product_obj = self.env["product.product"]
-        shopinvader_variant_obj = self.env["shopinvader.variant"]
-        binding_wizard_obj = self.env["shopinvader.variant.binding.wizard"]
-        unbinding_wizard_obj = self.env["shopinvader.variant.unbinding.wizard"]
         assortment_domain = self.product_assortment_id._get_eval_domain()
-        assortment_products = product_obj.search(assortment_domain)
-        variants_binded = shopinvader_variant_obj.search(
-            [("backend_id", "=", self.id)]
+        query = product_obj._where_calc(assortment_domain)
+        product_obj._apply_ir_rules(query, "read")
+        from_clause, where_clause, params = query.get_sql()
+        return from_clause, where_clause or "TRUE", params
+
+    def _get_assortment_fields(self):
+        """
+        Get the fields used by the assortment domain, for each model reached
+        by the field paths of the domain. The fields of the product template
+        are considered as fields of the product.
+        :return: dict {(model name, path from the product): set of field
+            names}
+        """
+        self.ensure_one()
+        domain = self.product_assortment_id._get_eval_domain()
+        res = defaultdict(set)
+        res[("product.product", "")].add("active")
+        for leaf in domain:
+            if not expression.is_leaf(leaf) or isinstance(leaf[0], int):
+                continue
+            model = self.env["product.product"]
+            path = []
+            for name in leaf[0].split("."):
+                if not path and name == "product_tmpl_id":
+                    # the fields of the template are fields of the product
+                    continue
+                res[(model._name, ".".join(path))].add(name)
+                field = model._fields.get(name)
+                if not field or not field.relational:
+                    break
+                path.append(name)
+                model = self.env[field.comodel_name]
+        return res
+
+    def _get_assortment_diff(self, product_ids=None):
+        """
+        Compute the difference between the products of the assortment and
+        the products binded on the backend with SQL anti-joins
+        :param product_ids: list of int, restrict the diff to these products
+        :return: tuple (list of product ids to bind, list of variant ids to
+            unbind)
+        """
+        self.ensure_one()
+        from_clause, where_clause, params = self._get_assortment_query()
+        product_filter = variant_filter = ""
+        filter_params = []
+        if product_ids is not None:
+            if not product_ids:
+                return [], []
+            product_filter = "AND product_product.id IN %s"
+            variant_filter = "AND sv.record_id IN %s"
+            filter_params = [tuple(product_ids)]
+        cr = self.env.cr
+        cr.execute(
+            """
+            SELECT product_product.id
+            FROM %s
+            WHERE %s
+            %s
+            AND NOT EXISTS (
+                SELECT 1 FROM shopinvader_variant sv
+                WHERE sv.record_id = product_product.id
+                AND sv.backend_id = %%s
+                AND sv.active)
+            ORDER BY product_product.id
+            """
+            % (from_clause, where_clause, product_filter),
+            params + filter_params + [self.id],
         )
-        products_binded = variants_binded.mapped("record_id")
-        products_to_bind = assortment_products - products_binded
-        products_to_unbind = products_binded - assortment_products
-        variants_to_unbind = variants_binded.filtered(
-            lambda x: x.record_id.id in products_to_unbind.ids
+        product_ids_to_bind = [row[0] for row in cr.fetchall()]
+        cr.execute(
+            """
+            SELECT sv.id
+            FROM shopinvader_variant sv
+            WHERE sv.backend_id = %%s
+            AND sv.active
+            %s
+            AND NOT EXISTS (
+                SELECT 1 FROM %s
+                WHERE %s
+                AND product_product.id = sv.record_id)
+            ORDER BY sv.id
+            """
+            % (variant_filter, from_clause, where_clause),
+            [self.id] + filter_params + params,
         )
+        variant_ids = [row[0] for row in cr.fetchall()]
+        return product_ids_to_bind, variant_ids
 
-        if products_to_bind:
-            binding_wizard = binding_wizard_obj.create(
-                {
-                    "backend_id": self.id,
-                    "product_ids": [(6, 0, products_to_bind.ids)],
-                }
+    @api.multi
+    @job(default_channel="root.shopinvader")
+    def _autobind_product_chunk(self, product_ids):
+        self.ensure_one()
+        # the assortment may have changed since the creation of the job
+        product_ids = self._get_assortment_diff(product_ids)[0]
+        if product_ids:
+            binding_wizard = self.env[
+                "shopinvader.variant.binding.wizard"
+            ].create(
+                {"backend_id": self.id, "product_ids": [(6, 0, product_ids)]}
             )
             binding_wizard.bind_products()
+        return _("%s products binded") % len(product_ids)
 
-        if variants_to_unbind:
-            unbinding_wizard = unbinding_wizard_obj.create(
-                {"shopinvader_variant_ids": [(6, 0, variants_to_unbind.ids)]}
-            )
+    @api.multi
+    @job(default_channel="root.shopinvader")
+    def _autounbind_variant_chunk(self, variant_ids):
+        self.ensure_one()
+        variants = self.env["shopinvader.variant"].browse(variant_ids).exists()
+        # the assortment may have changed since the creation of the job
+        variant_ids = set(
+            self._get_assortment_diff(variants.mapped("record_id").ids)[1]
+        )
+        variants = variants.filtered(lambda v: v.id in variant_ids)
+        if variants:
+            unbinding_wizard = self.env[
+                "shopinvader.variant.unbinding.wizard"
+            ].create({"shopinvader_variant_ids": [(6, 0, variants.ids)]})
             unbinding_wizard.unbind_products()
+        return _("%s variants unbinded") % len(variants)
+
+    @api.multi
+    def _autobind_product_from_assortment(
+        self, delay=False, chunk_size=None, product_ids=None
+    ):
+        """
+        Bind the products of the assortment and unbind the variants not in
+        the assortment anymore
+        :param product_ids: list of int, only check these products (all the
+            products if None)
+        :param delay: bool, if True the products are binded and unbinded by
+            jobs
+        :param chunk_size: int, number of products binded or unbinded by
+            chunk
+        """
+        self.ensure_one()
+        chunk_size = chunk_size or ASSORTMENT_CHUNK_SIZE
+        product_ids, variant_ids = self._get_assortment_diff(product_ids)
+        for start in range(0, len(product_ids), chunk_size):
+            chunk = product_ids[start : start + chunk_size]
+            if delay:
+                description = _("Bind %s products of the assortment") % len(
+                    chunk
+                )
+                self.with_delay(
+                    description=description, identity_key=identity_exact
+                )._autobind_product_chunk(chunk)
+            else:
+                self._autobind_product_chunk(chunk)
+        for start in range(0, len(variant_ids), chunk_size):
+            chunk = variant_ids[start : start + chunk_size]
+            if delay:
+                description = _(
+                    "Unbind %s variants out of the assortment"
+                ) % len(chunk)
+                self.with_delay(
+                    description=description, identity_key=identity_exact
+                )._autounbind_variant_chunk(chunk)
+            else:
+                self._autounbind_variant_chunk(chunk)
 
     @api.model
-    def autobind_product_from_assortment(self, domain=None):
+    def autobind_product_from_assortment(self, domain=None, delay=False):
         if domain is None:
             domain = []
 
@@ -63,7 +203,62 @@ class ShopinvaderBackend(models.Model):
         )
 
         for backend in self.search(domain):
-            backend._autobind_product_from_assortment()
+            backend._autobind_product_from_assortment(delay=delay)
+
+    @api.model
+    def _get_assortment_backends(self):
+        return self.search(
+            [
+                ("product_manual_binding", "!=", True),
+                ("product_assortment_id", "!=", False),
+            ]
+        )
+
+    @api.multi
+    @job(default_channel="root.shopinvader")
+    def _update_assortment_product_ids(self, product_ids):
+        self.ensure_one()
+        self._autobind_product_from_assortment(product_ids=product_ids)
+        return _("%s products checked") % len(product_ids)
+
+    @api.model
+    def _update_assortment_records(self, records, fields_changed=None):
+        """
+        Check the products linked to the given records against the
+        assortment of each backend and bind or unbind them with one job per
+        backend
+        :param records: product.product recordset or recordset of a model
+            reached by a field path of the assortment domains
+        :param fields_changed: set of the modified fields, the assortments
+            using none of these fields are not checked. All the assortments
+            are checked if None
+        """
+        if not records:
+            return
+        product_obj = self.env["product.product"].with_context(
+            active_test=False
+        )
+        for backend in self._get_assortment_backends():
+            product_ids = set()
+            assortment_fields = backend._get_assortment_fields()
+            for (model, path), field_names in assortment_fields.items():
+                if model != records._name or (
+                    fields_changed is not None
+                    and not fields_changed & field_names
+                ):
+                    continue
+                if path:
+                    product_ids.update(
+                        product_obj.search([(path, "in", records.ids)]).ids
+                    )
+                else:
+                    product_ids.update(records.ids)
+            if product_ids:
+                description = _("Check %s products against the assortment")
+                backend.with_delay(
+                    description=description % len(product_ids),
+                    identity_key=identity_exact,
+                )._update_assortment_product_ids(sorted(product_ids))
 
     @api.multi
     def force_recompute_all_binding_index(self):
@@ -2,10 +2,11 @@
 # Copyright 2018 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from odoo.addons.queue_job.tests.common import JobMixin
 from odoo.tests.common import TransactionCase
 
 
-class TestProductAutoBind(TransactionCase):
+class TestProductAutoBind(TransactionCase, JobMixin):
     def setUp(self):
         super(TestProductAutoBind, self).setUp()
         self.backend = self.env.ref("shopinvader.backend_1")
@@ -125,3 +126,105 @@ class TestProductAutoBind(TransactionCase):
             ]
         )
         self.assertTrue(excluded_variant)
+
+    def test_shopinvader_product_auto_bind_delay(self):
+        domain = self.backend.product_assortment_id._get_eval_domain()
+        products_to_bind = self.product_obj.search(domain)
+        self.assertTrue(len(products_to_bind) > 2)
+        jobs = self.job_counter()
+        self.backend._autobind_product_from_assortment(
+            delay=True, chunk_size=2
+        )
+        self.assertEqual(
+            jobs.count_created(), (len(products_to_bind) + 1) // 2
+        )
+        self.perform_jobs(jobs)
+        variants = self.variant_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertEqual(
+            products_to_bind.ids, variants.mapped("record_id").ids
+        )
+        # nothing more to bind
+        self.assertEqual(self.backend._get_assortment_diff(), ([], []))
+
+    def test_shopinvader_product_incremental_bind(self):
+        self.backend.autobind_product_from_assortment()
+        product = self.env.ref("product.product_product_7")
+        self.assertTrue(product.shopinvader_bind_ids)
+
+        # a field not used by the assortment does not check the product
+        jobs = self.job_counter()
+        product.write({"default_code": "INCREMENTAL"})
+        self.assertEqual(jobs.count_created(), 0)
+
+        # the product is out of the assortment
+        product.write({"sale_ok": False})
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        variants = self.variant_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertNotIn(product, variants.mapped("record_id"))
+
+        # the product is back in the assortment
+        jobs = self.job_counter()
+        product.write({"sale_ok": True})
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        variants = self.variant_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertIn(product, variants.mapped("record_id"))
+
+    def test_shopinvader_product_incremental_bind_batch(self):
+        self.backend.autobind_product_from_assortment()
+        products = self.env.ref("product.product_product_7") | self.env.ref(
+            "product.product_product_8"
+        )
+        # one job checks all the modified products of the backend
+        jobs = self.job_counter()
+        products.write({"sale_ok": False})
+        self.assertEqual(jobs.count_created(), 1)
+        # the same check is not queued twice
+        products.write({"sale_ok": False})
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        variants = self.variant_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertFalse(products & variants.mapped("record_id"))
+
+    def test_shopinvader_assortment_fields(self):
+        self.backend.product_assortment_id.domain = (
+            "[('sale_ok', '=', True), ('categ_id.name', '!=', 'Excluded'), "
+            "('product_tmpl_id.list_price', '>', 0)]"
+        )
+        self.assertEqual(
+            dict(self.backend._get_assortment_fields()),
+            {
+                ("product.product", ""): {
+                    "active",
+                    "sale_ok",
+                    "categ_id",
+                    "list_price",
+                },
+                ("product.category", "categ_id"): {"name"},
+            },
+        )
+
+    def test_shopinvader_product_incremental_bind_category(self):
+        self.backend.autobind_product_from_assortment()
+        product = self.env.ref("product.product_product_7")
+        self.backend.product_assortment_id.domain = (
+            "[('sale_ok', '=', True), ('categ_id.name', '!=', 'Excluded')]"
+        )
+        # the products of the modified category are checked
+        jobs = self.job_counter()
+        product.categ_id.write({"name": "Excluded"})
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        variants = self.variant_obj.search(
+            [("backend_id", "=", self.backend.id)]
+        )
+        self.assertNotIn(product, variants.mapped("record_id"))
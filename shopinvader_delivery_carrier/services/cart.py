@@ -126,18 +126,8 @@ class CartService(Component):
         return {}
 
     # internal methods
-    def _add_item(self, cart, params):
-        res = super(CartService, self)._add_item(cart, params)
-        self._unset_carrier(cart)
-        return res
-
-    def _update_item(self, cart, params, item=False):
-        res = super(CartService, self)._update_item(cart, params, item)
-        self._unset_carrier(cart)
-        return res
-
-    def _delete_item(self, cart, params):
-        res = super(CartService, self)._delete_item(cart, params)
+    def _after_items_change(self, cart):
+        res = super(CartService, self)._after_items_change(cart)
         self._unset_carrier(cart)
         return res
 
@@ -1 +1,2 @@
 from . import exporter
+from . import adapter
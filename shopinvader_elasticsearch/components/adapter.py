@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+
+import logging
+
+from odoo.addons.component.core import Component
+from odoo.addons.connector_elasticsearch.components.adapter import (
+    ElasticsearchAdapter,
+)
+
+_logger = logging.getLogger(__name__)
+
+try:
+    from elasticsearch import helpers
+except ImportError as err:
+    _logger.debug(err)
+
+
+class ShopinvaderElasticsearchAdapter(Component):
+    _inherit = ElasticsearchAdapter._name
+
+    _doc_type = "odoo"
+
+    def partial_update(self, datas):
+        """
+        Update only the given fields of the documents
+        :param datas: list of dict with the objectID and the fields
+        """
+        index_name = self.work.index.name.lower()
+        actions = []
+        for data in datas:
+            doc = dict(data)
+            actions.append(
+                {
+                    "_op_type": "update",
+                    "_index": index_name,
+                    "_type": self._doc_type,
+                    "_id": doc.pop("objectID"),
+                    "doc": doc,
+                }
+            )
+        helpers.bulk(self._get_es_client(), actions)
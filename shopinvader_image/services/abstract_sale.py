@@ -13,3 +13,22 @@ class AbstractSaleService(AbstractComponent):
         res = super(AbstractSaleService, self)._parser_product()
         res.append("images")
         return res
+
+    def _get_product_cache_key(self, variant):
+        # the images, their tags and the resizes are serialized with the
+        # product
+        relations = variant.variant_image_ids
+        revisions = []
+        for records in (
+            relations,
+            relations.mapped("image_id"),
+            relations.mapped("tag_id"),
+            variant.backend_id.shopinvader_variant_resize_ids,
+        ):
+            revisions += [
+                (record._name, record.id, record.write_date)
+                for record in records
+            ]
+        return super(AbstractSaleService, self)._get_product_cache_key(
+            variant
+        ) + (tuple(revisions),)
@@ -7,7 +7,7 @@
     "name": "Shopinvader Product Stock",
     "summary": "This module is used to choose a stock field during the"
     "export (by backend)",
-    "version": "10.0.1.0.1",
+    "version": "10.0.1.1.0",
     "category": "e-commerce",
     "website": "https://akretion.com",
     "author": "Akretion,ACSONE SA/NV",
@@ -20,7 +20,12 @@
         "connector_search_engine",
         "shopinvader_search_engine",
     ],
-    "data": ["views/shopinvader_backend.xml", "data/ir_export_product.xml"],
+    "data": [
+        "security/ir.model.access.csv",
+        "views/shopinvader_backend.xml",
+        "data/ir_export_product.xml",
+        "data/ir_cron.xml",
+    ],
     "external_dependencies": {"python": ["openupgradelib", "slugify"]},
     "pre_init_hook": "pre_init_hook",
     "post_init_hook": "post_init_hook",
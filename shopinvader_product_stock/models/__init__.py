@@ -5,5 +5,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 from . import shopinvader_backend
 from . import shopinvader_variant
+from . import shopinvader_stock_queue
 from . import stock_move
 from . import product_product
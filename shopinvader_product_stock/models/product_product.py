@@ -3,13 +3,154 @@
 # Copyright 2018 ACSONE SA/NV
 # Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from collections import defaultdict
+
 from odoo import api, models
 from odoo.addons.queue_job.job import job
+from odoo.tools import float_round
+
+STOCK_QTY_FIELDS = [
+    "qty_available",
+    "virtual_available",
+    "incoming_qty",
+    "outgoing_qty",
+]
+# the stock quantities computed with these context keys can not be computed
+# by `_get_stock_quantities_by_key`
+STOCK_QTY_CONTEXT_KEYS = [
+    "lot_id",
+    "owner_id",
+    "package_id",
+    "from_date",
+    "to_date",
+]
 
 
 class ProductProduct(models.Model):
     _inherit = "product.product"
 
+    def _get_stock_quantities_by_key(self, warehouse_keys):
+        """
+        Compute the stock quantities of the products for several sets of
+        warehouses with one grouped query on the quants and one on the
+        moves (instead of one computation for each set of warehouses).
+        The quantities are computed like the standard stock fields with a
+        'warehouse' context.
+        :param warehouse_keys: dict {key: warehouse ids}
+        :return: dict {key: {product id: {stock field name: qty}}} or None
+            if the quantities depend on the context
+        """
+        if any(self.env.context.get(key) for key in STOCK_QTY_CONTEXT_KEYS):
+            return None
+        res = {
+            key: {
+                product.id: dict.fromkeys(STOCK_QTY_FIELDS, 0.0)
+                for product in self
+            }
+            for key in warehouse_keys
+        }
+        warehouse_obj = self.env["stock.warehouse"]
+        ranges = []
+        for key, warehouse_ids in warehouse_keys.items():
+            for warehouse in warehouse_obj.browse(warehouse_ids):
+                location = warehouse.view_location_id
+                ranges.append(
+                    (key, location.parent_left, location.parent_right)
+                )
+        if not self or not ranges:
+            return res
+        quants = defaultdict(float)
+        incomings = defaultdict(float)
+        outgoings = defaultdict(float)
+        values = ", ".join(["%s"] * len(ranges))
+        self.env.cr.execute(
+            """
+            WITH wh(key, parent_left, parent_right) AS (VALUES %s)
+            SELECT q.product_id, k.key, SUM(q.qty)
+            FROM stock_quant q
+            JOIN stock_location l ON l.id = q.location_id
+            CROSS JOIN (SELECT DISTINCT key FROM wh) k
+            WHERE q.product_id IN %%s
+            AND EXISTS (
+                SELECT 1 FROM wh
+                WHERE wh.key = k.key
+                AND l.parent_left >= wh.parent_left
+                AND l.parent_left < wh.parent_right)
+            GROUP BY q.product_id, k.key
+            """
+            % values,
+            ranges + [tuple(self.ids)],
+        )
+        for product_id, key, qty in self.env.cr.fetchall():
+            quants[(product_id, key)] = qty
+        self.env.cr.execute(
+            """
+            WITH wh(key, parent_left, parent_right) AS (VALUES %s)
+            SELECT m.product_id, k.key,
+                SUM(CASE WHEN f.dest_in AND NOT f.src_in
+                    THEN m.product_qty ELSE 0 END),
+                SUM(CASE WHEN f.src_in AND NOT f.dest_in
+                    THEN m.product_qty ELSE 0 END)
+            FROM stock_move m
+            JOIN stock_location ls ON ls.id = m.location_id
+            JOIN stock_location ld ON ld.id = m.location_dest_id
+            CROSS JOIN (SELECT DISTINCT key FROM wh) k
+            CROSS JOIN LATERAL (
+                SELECT
+                    EXISTS(
+                        SELECT 1 FROM wh
+                        WHERE wh.key = k.key
+                        AND ls.parent_left >= wh.parent_left
+                        AND ls.parent_left < wh.parent_right) AS src_in,
+                    EXISTS(
+                        SELECT 1 FROM wh
+                        WHERE wh.key = k.key
+                        AND ld.parent_left >= wh.parent_left
+                        AND ld.parent_left < wh.parent_right) AS dest_in
+            ) f
+            WHERE m.product_id IN %%s
+            AND m.state NOT IN ('done', 'cancel', 'draft')
+            GROUP BY m.product_id, k.key
+            """
+            % values,
+            ranges + [tuple(self.ids)],
+        )
+        for product_id, key, incoming, outgoing in self.env.cr.fetchall():
+            incomings[(product_id, key)] = incoming
+            outgoings[(product_id, key)] = outgoing
+        for product in self:
+            rounding = product.uom_id.rounding
+            for key in warehouse_keys:
+                qty = quants[(product.id, key)]
+                incoming = incomings[(product.id, key)]
+                outgoing = outgoings[(product.id, key)]
+                res[key][product.id] = {
+                    "qty_available": float_round(
+                        qty, precision_rounding=rounding
+                    ),
+                    "incoming_qty": float_round(
+                        incoming, precision_rounding=rounding
+                    ),
+                    "outgoing_qty": float_round(
+                        outgoing, precision_rounding=rounding
+                    ),
+                    "virtual_available": float_round(
+                        qty + incoming - outgoing, precision_rounding=rounding
+                    ),
+                }
+        return res
+
+    def _set_stock_quantities_cache(self, quantities):
+        """
+        Put the given stock quantities in the cache of the products (for the
+        context of the recordset) so the stock fields are read without any
+        computation
+        :param quantities: dict {product id: {stock field name: qty}}
+        """
+        for product in self:
+            for field_name, qty in quantities[product.id].items():
+                product._cache[field_name] = qty
+
     @api.multi
     @job(default_channel="root.search_engine.synchronize_stock")
     def _synchronize_all_binding_stock_level(self):
@@ -17,38 +158,62 @@ class ProductProduct(models.Model):
         The goal of this function is to compute the new stock information
         and update them in the data field. If data have change and the binding
         is in done state we force it to 'to_update'.
+        The stock data of all the bindings are computed at once and the
+        bindings to synchronize immediatly are exported with one call per
+        index.
         :return:
         """
         all_bindinds = self.mapped("shopinvader_bind_ids")
         backends = all_bindinds.mapped("backend_id")
         for backend in backends:
+            # The bindings in 'new' state have been not yet computed
+            # so we do not care to update them as they are not yet
+            # on the site. The right stock qty will be exported
+            # at their first export
             bindings = all_bindinds.filtered(
                 lambda r, b=backend: r.backend_id == b
+                and r.sync_state != "new"
             )
             # To avoid access rights issues, execute the job with the user
             # related to the backend
             bindings = bindings.sudo(backend.user_id.id)
-            for binding in bindings:
-                if binding.sync_state == "new":
-                    # this binding have been not yet computed
-                    # so we do not care to update it as it's not yet
-                    # on the site. The right stock qty will be exported
-                    # at it's first export
-                    continue
+            for index in bindings.mapped("index_id"):
+                index_bindings = bindings.filtered(
+                    lambda r, i=index: r.index_id == i
+                )
                 # I do not recommend to rename the stock export key, but if
                 # you have a good reason to do it, do not worry we will use
                 # this key here
-                stock_export_key = binding._get_stock_export_key()
+                stock_export_key = index_bindings[0]._get_stock_export_key()
                 if not stock_export_key:
                     continue
-                data = binding.data
-                if data[stock_export_key] != binding.stock_data:
+                to_export = index_bindings.browse()
+                in_sync = index_bindings.browse()
+                # the stock data of all the bindings are computed when
+                # reading the first one
+                for binding in index_bindings:
+                    data = binding.data
+                    if data.get(stock_export_key) == binding.stock_data:
+                        continue
+                    if binding._is_data_exported():
+                        in_sync |= binding
                     data[stock_export_key] = binding.stock_data
                     vals = {"data": data}
-                    if binding.backend_id.synchronize_stock == "immediatly":
-                        binding.write(vals)
-                        binding.synchronize()
-                    elif binding.backend_id.synchronize_stock == "in_batch":
-                        if binding.sync_state == "done":
-                            vals["sync_state"] = "to_update"
-                        binding.write(vals)
+                    if (
+                        backend.synchronize_stock == "in_batch"
+                        and binding.sync_state == "done"
+                    ):
+                        vals["sync_state"] = "to_update"
+                    binding.write(vals)
+                    to_export |= binding
+                if backend.synchronize_stock == "immediatly" and to_export:
+                    # only the stock is sent to the search engine
+                    to_export.export_partial(
+                        [stock_export_key], in_sync=in_sync
+                    )
+                    # the bindings with other changes are still to update,
+                    # unless their whole data have been exported
+                    to_export.filtered(
+                        lambda b: b.sync_state != "done"
+                        and b.data_hash == b._get_data_hash()
+                    ).write({"sync_state": "done"})
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Akretion (http://www.akretion.com)
+# Copyright 2018 ACSONE SA/NV
+# Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from odoo import _, api, fields, models
+from odoo.addons.queue_job.job import identity_exact, job
+
+STOCK_QUEUE_BATCH_SIZE = 1000
+
+
+class ShopinvaderStockQueue(models.Model):
+    """
+    Products waiting for the synchronization of their stock level.
+    The stock moves only insert their products in this queue, the queue is
+    drained by a single job (see `_drain`) so the products updated by a lot
+    of moves are synchronized at once.
+    """
+
+    _name = "shopinvader.stock.queue"
+    _description = "Shopinvader Stock Synchronization Queue"
+    _log_access = False
+
+    product_id = fields.Many2one(
+        "product.product", required=True, ondelete="cascade"
+    )
+
+    _sql_constraints = [
+        (
+            "product_uniq",
+            "unique(product_id)",
+            "A product can only be queued once",
+        )
+    ]
+
+    @api.model
+    def _enqueue_products(self, products):
+        """
+        Add the products to the queue (the products already queued are
+        ignored) and delay the job draining the queue
+        :param products: product.product recordset
+        """
+        if not products:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO shopinvader_stock_queue (product_id)
+            SELECT unnest(%s)
+            ON CONFLICT (product_id) DO NOTHING
+            """,
+            (products.ids,),
+        )
+        self._delay_drain()
+
+    @api.model
+    def _delay_drain(self):
+        # the identity key ensures that only one job is pending to drain
+        # the queue, whatever the number of moves
+        description = _("Update shopinvader variants (stock update trigger)")
+        self.with_delay(
+            description=description, identity_key=identity_exact
+        )._drain()
+
+    @api.model
+    def _cron_drain(self):
+        self.env.cr.execute("SELECT 1 FROM shopinvader_stock_queue LIMIT 1")
+        if self.env.cr.fetchone():
+            self._delay_drain()
+        return True
+
+    @api.model
+    def _process_products(self, products):
+        """
+        Process the products removed from the queue
+        :param products: product.product recordset
+        """
+        products._synchronize_all_binding_stock_level()
+
+    @api.model
+    @job(default_channel="root.search_engine.synchronize_stock")
+    def _drain(self, batch_size=STOCK_QUEUE_BATCH_SIZE):
+        """
+        Synchronize the stock level of a batch of queued products. A new job
+        is delayed if the queue is not empty.
+        :param batch_size: int, number of products to synchronize
+        """
+        self.env.cr.execute(
+            """
+            DELETE FROM shopinvader_stock_queue
+            WHERE id IN (
+                SELECT id FROM shopinvader_stock_queue
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING product_id
+            """,
+            (batch_size,),
+        )
+        product_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not product_ids:
+            return _("Nothing to synchronize")
+        products = self.env["product.product"].browse(product_ids)
+        self._process_products(products)
+        self._cron_drain()
+        return _("Stock synchronized for %s products") % len(product_ids)
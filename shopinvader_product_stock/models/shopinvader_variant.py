@@ -15,17 +15,7 @@ class ShopinvaderVariant(models.Model):
     stock_data = fields.Serialized(compute="_compute_stock_data")
 
     def _get_stock_export_key(self):
-        self.ensure_one()
-        line = self.env["ir.exports.line"].search(
-            [
-                ("export_id", "=", self.index_id.exporter_id.id),
-                ("name", "=", "stock_data"),
-            ]
-        )
-        if line.alias:
-            return line.alias.split(":")[1]
-        else:
-            return line.name
+        return self._get_export_key("stock_data")
 
     def _prepare_stock_data(self):
         stock_field = self.backend_id.product_stock_field_id.name
@@ -34,13 +24,19 @@ class ShopinvaderVariant(models.Model):
     def _compute_stock_data(self):
         result = defaultdict(dict)
         for backend in self.mapped("backend_id"):
-            for (
-                wh_key,
-                wh_ids,
-            ) in backend._get_warehouse_list_for_export().items():
-                for loc_record in self.filtered(
-                    lambda s: s.backend_id == backend
-                ).with_context(warehouse=wh_ids):
+            records = self.filtered(lambda s, b=backend: s.backend_id == b)
+            wh_list = backend._get_warehouse_list_for_export()
+            # the quantities of all the warehouses are computed at once
+            quantities = records.mapped(
+                "record_id"
+            )._get_stock_quantities_by_key(wh_list)
+            for wh_key, wh_ids in wh_list.items():
+                loc_records = records.with_context(warehouse=wh_ids)
+                if quantities is not None:
+                    loc_records.mapped(
+                        "record_id"
+                    )._set_stock_quantities_cache(quantities[wh_key])
+                for loc_record in loc_records:
                     result[loc_record.id][
                         wh_key
                     ] = loc_record._prepare_stock_data()
@@ -4,8 +4,7 @@
 # Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
-from odoo import _, api, models
-from odoo.addons.queue_job.job import identity_exact
+from odoo import api, models
 
 
 class StockMove(models.Model):
@@ -22,18 +21,12 @@ class StockMove(models.Model):
     @api.multi
     def _jobify_product_stock_update(self):
         """
-        Trigger on update on related backend if the product quantity has been
-        updated since last sync.
+        Queue the products of the moves for the synchronization of their
+        stock level. The queue is drained by a single job.
         :return: bool
         """
         products = self._get_product_to_update()
-        if products:
-            description = _(
-                "Update shopinvader variants (stock update trigger)"
-            )
-            products.with_delay(
-                description=description, identity_key=identity_exact
-            )._synchronize_all_binding_stock_level()
+        self.env["shopinvader.stock.queue"]._enqueue_products(products)
         return True
 
     @api.multi
@@ -4,6 +4,8 @@
 # Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+import mock
+
 from odoo.addons.connector_search_engine.tests.models import SeAdapterFake
 
 from .common import StockCommonCase
@@ -75,6 +77,57 @@ class TestProductProduct(StockCommonCase):
         self.shopinvader_backend.synchronize_stock = "in_batch"
         self._test_update_stock_with_key("stock", sync_immediatly=False)
 
+    def _test_update_stock_partial(self, sync_state):
+        """
+        :param sync_state: state of the binding before the stock update
+        """
+        shopinvader_product = self.product.shopinvader_bind_ids
+        shopinvader_product.recompute_json()
+        with SeAdapterFake.mocked_calls():
+            shopinvader_product.export()
+        shopinvader_product.sync_state = sync_state
+        jobs = self.job_counter()
+        self._add_stock_to_product(self.product, self.loc_1, 100)
+        with mock.patch.object(
+            SeAdapterFake, "partial_update", create=True
+        ) as partial_update:
+            self.perform_jobs(jobs)
+        # only the stock is sent to the search engine
+        partial_update.assert_called_once_with(
+            [
+                {
+                    "objectID": self.product.id,
+                    "stock": {u"global": {u"qty": 100.0}},
+                }
+            ]
+        )
+        self.assertEqual(shopinvader_product.sync_state, sync_state)
+        if sync_state == "done":
+            # the index has the whole data of the binding
+            self.assertEqual(
+                shopinvader_product.data_hash,
+                shopinvader_product._get_data_hash(),
+            )
+            with SeAdapterFake.mocked_calls() as calls:
+                shopinvader_product.export()
+            self.assertFalse(calls)
+        else:
+            # the whole data must be pushed at the next export
+            self.assertFalse(shopinvader_product.data_hash)
+
+    def test_update_stock_partial(self):
+        """
+        Updating the stock of an exported product only sends the stock
+        """
+        self._test_update_stock_partial("done")
+
+    def test_update_stock_partial_to_update(self):
+        """
+        Updating the stock of a product with other changes to export only
+        sends the stock, the product is still to update
+        """
+        self._test_update_stock_partial("to_update")
+
     def test_update_stock_with_special_key(self):
         """
         Recomputing product should update binding
@@ -151,3 +204,31 @@ class TestProductProduct(StockCommonCase):
                 u"wh": {u"qty": 100.0},
             },
         )
+
+    def test_stock_quantities_by_key(self):
+        self._add_stock_to_product(self.product, self.loc_1, 100)
+        self._add_stock_to_product(self.product, self.loc_2, 200)
+        move = self._create_incomming_move()
+        move.action_confirm()
+        warehouse_keys = {
+            "global": [self.warehouse_1.id, self.warehouse_2.id],
+            "wh": [self.warehouse_1.id],
+            "chic": [self.warehouse_2.id],
+        }
+        quantities = self.product._get_stock_quantities_by_key(
+            warehouse_keys
+        )
+        for key, wh_ids in warehouse_keys.items():
+            product = self.product.with_context(warehouse=wh_ids)
+            self.assertEqual(
+                quantities[key][self.product.id],
+                {
+                    "qty_available": product.qty_available,
+                    "virtual_available": product.virtual_available,
+                    "incoming_qty": product.incoming_qty,
+                    "outgoing_qty": product.outgoing_qty,
+                },
+            )
+        self.assertEqual(
+            quantities["global"][self.product.id]["qty_available"], 300.0
+        )
@@ -79,3 +79,19 @@ class TestStockMove(StockCommonCase):
         move = self._create_incomming_move()
         move.action_done()
         self.assertEqual(job.count_created(), 1)
+
+    def test_queue_coalesce_moves(self):
+        """
+        The products of several moves are queued once and synchronized by
+        a single job
+        :return:
+        """
+        job = self.job_counter()
+        for _i in range(3):
+            move = self._create_incomming_move()
+            move.action_done()
+        self.assertEqual(job.count_created(), 1)
+        queue = self.env["shopinvader.stock.queue"]
+        self.assertEqual(queue.search([]).mapped("product_id"), self.product)
+        self.perform_jobs(job)
+        self.assertFalse(queue.search([]))
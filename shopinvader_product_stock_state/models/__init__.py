@@ -5,3 +5,4 @@
 
 from . import shopinvader_variant
 from . import shopinvader_backend
+from . import shopinvader_stock_queue
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Akretion (http://www.akretion.com)
+# Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+
+from odoo import api, models
+
+
+class ShopinvaderStockQueue(models.Model):
+    _inherit = "shopinvader.stock.queue"
+
+    @api.model
+    def _process_products(self, products):
+        super(ShopinvaderStockQueue, self)._process_products(products)
+        products._refresh_stored_stock_state()
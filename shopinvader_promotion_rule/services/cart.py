@@ -19,6 +19,13 @@ class AbstractSaleService(AbstractComponent):
         res = super(AbstractSaleService, self)._is_item(line)
         return res and not line.is_promotion_line
 
+    def _get_line_cache_key(self, line):
+        # the promotion rules are serialized with the line
+        rules = line.coupon_promotion_rule_id | line.promotion_rule_ids
+        return super(AbstractSaleService, self)._get_line_cache_key(line) + (
+            tuple((rule.id, rule.write_date) for rule in rules),
+        )
+
 
 class CartService(Component):
     _inherit = "shopinvader.cart.service"
@@ -48,18 +55,8 @@ class CartService(Component):
         cart.apply_promotions()
         return res
 
-    def _add_item(self, cart, params):
-        res = super(CartService, self)._add_item(cart, params)
-        cart.apply_promotions()
-        return res
-
-    def _update_item(self, cart, params, item=False):
-        res = super(CartService, self)._update_item(cart, params, item)
-        cart.apply_promotions()
-        return res
-
-    def _delete_item(self, cart, params):
-        res = super(CartService, self)._delete_item(cart, params)
+    def _after_items_change(self, cart):
+        res = super(CartService, self)._after_items_change(cart)
         cart.apply_promotions()
         return res
 
@@ -76,6 +73,8 @@ class CartService(Component):
         return res
 
     def _convert_one_line(self, line):
+        # the promotion rules are part of the cache key of the line (see
+        # _get_line_cache_key)
         res = super(CartService, self)._convert_one_line(line)
         res.update(self._get_promotions_info(line))
         return res
@@ -110,3 +110,32 @@ class ShopinvaderSaleProfile(models.Model):
                     "be unique per backend"
                 )
                 raise exceptions.ValidationError(message)
+
+    @api.model
+    def _get_price_configuration_fields(self):
+        return ["backend_id", "pricelist_id", "fiscal_position_ids", "code"]
+
+    @api.model
+    def create(self, vals):
+        record = super(ShopinvaderSaleProfile, self).create(vals)
+        self.env["shopinvader.variant"]._price_configuration_changed(
+            record.backend_id
+        )
+        return record
+
+    @api.multi
+    def write(self, vals):
+        backends = self.mapped("backend_id")
+        res = super(ShopinvaderSaleProfile, self).write(vals)
+        if set(vals) & set(self._get_price_configuration_fields()):
+            self.env["shopinvader.variant"]._price_configuration_changed(
+                backends | self.mapped("backend_id")
+            )
+        return res
+
+    @api.multi
+    def unlink(self):
+        backends = self.mapped("backend_id")
+        res = super(ShopinvaderSaleProfile, self).unlink()
+        self.env["shopinvader.variant"]._price_configuration_changed(backends)
+        return res
@@ -10,19 +10,18 @@ from odoo.fields import first
 class ShopinvaderVariant(models.Model):
     _inherit = "shopinvader.variant"
 
-    def _get_all_price(self):
+    def _get_price_configuration(self, backend):
         """
-        Compute the Serialized price field with prices for each sale profile
-        of related backend
-        :return:
+        Add the prices of each sale profile of the backend
+        :param backend: shopinvader.backend recordset
+        :return: list of tuple (price key, pricelist, fiscal position)
         """
-        res = super(ShopinvaderVariant, self)._get_all_price()
-        for sale_profile in self.backend_id.sale_profile_ids:
+        res = super(ShopinvaderVariant, self)._get_price_configuration(
+            backend
+        )
+        for sale_profile in backend.sale_profile_ids:
             fposition = first(sale_profile.fiscal_position_ids)
-            price = self._get_price(
-                sale_profile.pricelist_id,
-                fposition,
-                self.backend_id.company_id,
+            res.append(
+                (sale_profile.code, sale_profile.pricelist_id, fposition)
             )
-            res.update({sale_profile.code: price})
         return res
@@ -3,6 +3,8 @@
 # Copyright 2018 ACSONE SA/NV (<http://acsone.eu>)
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import mock
+
 from odoo.addons.shopinvader.tests.common import CommonCase
 from odoo.exceptions import ValidationError
 
@@ -38,3 +40,23 @@ class TestShopinvaderSaleProfile(CommonCase):
         with self.assertRaises(ValidationError):
             sale_profile.fiscal_position_ids = [(4, fposition.id)]
         return True
+
+    def test_price_configuration_changed(self):
+        """
+        Test that the variants are notified when the pricelist of a sale
+        profile is modified.
+        :return: bool
+        """
+        sale_profile = self.env.ref(
+            "shopinvader_sale_profile.shopinvader_sale_profile_3"
+        )
+        pricelist = self.env["product.pricelist"].create({"name": "Test"})
+        variant_cls = type(self.env["shopinvader.variant"])
+        with mock.patch.object(
+            variant_cls, "_price_configuration_changed"
+        ) as mocked:
+            sale_profile.default = False
+            mocked.assert_not_called()
+            sale_profile.pricelist_id = pricelist
+            mocked.assert_called_once_with(sale_profile.backend_id)
+        return True
@@ -6,17 +6,19 @@
 
 {
     "name": "Shopinvader Catalog Search Engine Connector",
-    "version": "10.0.1.0.1",
+    "version": "10.0.1.1.0",
     "author": "Akretion",
     "website": "www.akretion.com",
     "license": "AGPL-3",
     "category": "Generic Modules",
     "depends": ["shopinvader", "connector_search_engine"],
     "data": [
+        "security/ir.model.access.csv",
         "views/shopinvader_backend_view.xml",
         "views/product_view.xml",
         "views/product_category_view.xml",
         "data/ir_export_product.xml",
+        "data/ir_cron.xml",
     ],
     "demo": [],
     "installable": True,
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo.addons.component.core import Component
+
+
+class SeExporter(Component):
+    _inherit = "se.exporter"
+
+    # key of the data identifying the document in the index
+    _id_key = "objectID"
+
+    def _get_partial_data(self, record, keys):
+        data = record.data
+        keys = [self._id_key] + list(keys)
+        return {key: data[key] for key in keys if key in data}
+
+    def _run_partial(self, keys):
+        """
+        Only send the given keys of the data of the records to the index
+        """
+        datas = [
+            self._get_partial_data(record, keys)
+            for record in self.work.records
+        ]
+        self.backend_adapter.partial_update(datas)
+        return "Partially exported ids : %s" % self.work.records.ids
+
+    def run(self):
+        """
+        Only push the records whose data have changed since their last
+        export
+        """
+        records = self.work.records
+        hashes = {record.id: record._get_data_hash() for record in records}
+        to_push = records.filtered(lambda r: r.data_hash != hashes[r.id])
+        skipped = records - to_push
+        for index in records.mapped("index_id"):
+            index._add_export_counters(
+                len(to_push.filtered(lambda r, i=index: r.index_id == i)),
+                len(skipped.filtered(lambda r, i=index: r.index_id == i)),
+            )
+        # the data of the skipped records are already in the index
+        skipped.filtered(lambda r: r.sync_state != "done").write(
+            {"sync_state": "done"}
+        )
+        if not to_push:
+            return "No data changed for ids : %s" % records.ids
+        self.work.records = to_push
+        keys = records.env.context.get("se_partial_export_keys")
+        partial = keys and hasattr(self.backend_adapter, "partial_update")
+        try:
+            if partial:
+                res = self._run_partial(keys)
+            else:
+                res = super(SeExporter, self).run()
+        finally:
+            self.work.records = records
+        if partial:
+            # the index has the whole data of the bindings in sync before
+            # the partial export, only a part of the data of the others: it
+            # must be pushed at the next export
+            in_sync_ids = records.env.context.get(
+                "se_partial_export_in_sync_ids", []
+            )
+            in_sync = to_push.filtered(lambda r: r.id in in_sync_ids)
+            in_sync._write_data_hashes(hashes)
+            (to_push - in_sync).filtered("data_hash").write(
+                {"data_hash": False}
+            )
+        else:
+            to_push._write_data_hashes(hashes)
+        return res
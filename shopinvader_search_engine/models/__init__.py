@@ -1,6 +1,15 @@
 # -*- coding: utf-8 -*-
 
+from . import se_binding
 from . import shopinvader_backend
 from . import shopinvader_variant
+from . import shopinvader_variant_price
 from . import shopinvader_category
 from . import se_index
+from . import product_pricelist
+from . import product_pricelist_item
+from . import product_attribute_price
+from . import product_template
+from . import product_product
+from . import account_tax
+from . import account_fiscal_position
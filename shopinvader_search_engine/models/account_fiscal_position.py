@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class AccountFiscalPosition(models.Model):
+    _inherit = "account.fiscal.position"
+
+    @api.multi
+    def write(self, vals):
+        res = super(AccountFiscalPosition, self).write(vals)
+        if "tax_ids" in vals:
+            variant_obj = self.env["shopinvader.variant"]
+            variant_obj._delay_refresh_price_snapshot(
+                variant_obj._get_backends_using_price(fpositions=self)
+            )
+        return res
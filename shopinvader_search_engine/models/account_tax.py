@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class AccountTax(models.Model):
+    _inherit = "account.tax"
+
+    @api.model
+    def _get_shopinvader_price_fields(self):
+        return [
+            "amount",
+            "amount_type",
+            "price_include",
+            "include_base_amount",
+            "children_tax_ids",
+            "company_id",
+        ]
+
+    @api.multi
+    def write(self, vals):
+        res = super(AccountTax, self).write(vals)
+        if set(vals) & set(self._get_shopinvader_price_fields()):
+            # the taxes mapped by a fiscal position on the modified taxes
+            # impact the price too
+            mappings = self.env["account.fiscal.position.tax"].search(
+                [("tax_dest_id", "in", self.ids)]
+            )
+            taxes = self | mappings.mapped("tax_src_id")
+            self.env["shopinvader.variant"]._delay_refresh_price_snapshot(
+                self.env["shopinvader.backend"].search([]),
+                [("taxes_id", "in", taxes.ids)],
+            )
+        return res
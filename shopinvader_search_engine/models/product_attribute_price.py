@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductAttributePrice(models.Model):
+    _inherit = "product.attribute.price"
+
+    @api.model
+    def _refresh_shopinvader_price_snapshot(self, templates):
+        self.env["shopinvader.variant"]._delay_refresh_price_snapshot(
+            self.env["shopinvader.backend"].search([]),
+            [("product_tmpl_id", "in", templates.ids)],
+        )
+
+    @api.model
+    def create(self, vals):
+        record = super(ProductAttributePrice, self).create(vals)
+        self._refresh_shopinvader_price_snapshot(record.product_tmpl_id)
+        return record
+
+    @api.multi
+    def write(self, vals):
+        templates = self.mapped("product_tmpl_id")
+        res = super(ProductAttributePrice, self).write(vals)
+        self._refresh_shopinvader_price_snapshot(
+            templates | self.mapped("product_tmpl_id")
+        )
+        return res
+
+    @api.multi
+    def unlink(self):
+        templates = self.mapped("product_tmpl_id")
+        res = super(ProductAttributePrice, self).unlink()
+        self._refresh_shopinvader_price_snapshot(templates)
+        return res
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductPricelist(models.Model):
+    _inherit = "product.pricelist"
+
+    def _get_dependent_pricelists(self):
+        """
+        Get the pricelists and all the pricelists based on them (directly or
+        not)
+        :return: product.pricelist recordset
+        """
+        item_obj = self.env["product.pricelist.item"]
+        pricelists = self
+        to_check = pricelists
+        while to_check:
+            items = item_obj.search(
+                [
+                    ("base", "=", "pricelist"),
+                    ("base_pricelist_id", "in", to_check.ids),
+                ]
+            )
+            to_check = items.mapped("pricelist_id") - pricelists
+            pricelists |= to_check
+        return pricelists
+
+    def _get_base_pricelists(self):
+        """
+        Get the pricelists and all the pricelists they are based on
+        (directly or not)
+        :return: product.pricelist recordset
+        """
+        item_obj = self.env["product.pricelist.item"]
+        pricelists = self
+        to_check = pricelists
+        while to_check:
+            items = item_obj.search(
+                [
+                    ("base", "=", "pricelist"),
+                    ("pricelist_id", "in", to_check.ids),
+                ]
+            )
+            to_check = items.mapped("base_pricelist_id") - pricelists
+            pricelists |= to_check
+        return pricelists
+
+    @api.model
+    def _get_shopinvader_price_fields(self):
+        return ["currency_id", "discount_policy"]
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductPricelist, self).write(vals)
+        if set(vals) & set(self._get_shopinvader_price_fields()):
+            variant_obj = self.env["shopinvader.variant"]
+            variant_obj._delay_refresh_price_snapshot(
+                variant_obj._get_backends_using_price(
+                    pricelists=self._get_dependent_pricelists()
+                )
+            )
+        return res
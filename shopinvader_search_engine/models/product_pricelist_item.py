@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+from odoo.osv import expression
+
+
+class ProductPricelistItem(models.Model):
+    _inherit = "product.pricelist.item"
+
+    def _get_shopinvader_variant_domain(self):
+        """
+        Get the domain of the shopinvader variants whose price can be
+        impacted by the items
+        :return: list (domain on shopinvader.variant)
+        """
+        domains = []
+        for item in self:
+            if item.applied_on == "0_product_variant":
+                domains.append([("record_id", "=", item.product_id.id)])
+            elif item.applied_on == "1_product":
+                domains.append(
+                    [("product_tmpl_id", "=", item.product_tmpl_id.id)]
+                )
+            elif item.applied_on == "2_product_category":
+                domains.append([("categ_id", "child_of", item.categ_id.id)])
+            else:
+                return expression.TRUE_DOMAIN
+        return expression.OR(domains)
+
+    def _get_shopinvader_price_scope(self):
+        """
+        Get the variants whose price can be impacted by the items
+        :return: tuple (shopinvader.backend recordset, domain on
+            shopinvader.variant)
+        """
+        if not self:
+            return (
+                self.env["shopinvader.backend"].browse(),
+                expression.FALSE_DOMAIN,
+            )
+        pricelists = self.mapped("pricelist_id")._get_dependent_pricelists()
+        backends = self.env["shopinvader.variant"]._get_backends_using_price(
+            pricelists=pricelists
+        )
+        return backends, self._get_shopinvader_variant_domain()
+
+    def _refresh_shopinvader_price_snapshot(self, previous_scope=None):
+        backends, domain = self._get_shopinvader_price_scope()
+        if previous_scope:
+            previous_backends, previous_domain = previous_scope
+            if backends != previous_backends:
+                # keep it simple, the impacted variants are refreshed on
+                # all the impacted backends
+                backends |= previous_backends
+            domain = expression.OR([domain, previous_domain])
+        self.env["shopinvader.variant"]._delay_refresh_price_snapshot(
+            backends, domain
+        )
+
+    @api.model
+    def create(self, vals):
+        record = super(ProductPricelistItem, self).create(vals)
+        record._refresh_shopinvader_price_snapshot()
+        return record
+
+    @api.multi
+    def write(self, vals):
+        # the variants impacted before the modification (if the item is
+        # moved on an other product) must be refreshed too
+        previous_scope = self._get_shopinvader_price_scope()
+        res = super(ProductPricelistItem, self).write(vals)
+        self._refresh_shopinvader_price_snapshot(previous_scope)
+        return res
+
+    @api.multi
+    def unlink(self):
+        self._refresh_shopinvader_price_snapshot()
+        return super(ProductPricelistItem, self).unlink()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    @api.model
+    def _get_shopinvader_price_fields(self):
+        # the fields of the template are managed by the template
+        return ["standard_price"]
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductProduct, self).write(vals)
+        if set(vals) & set(self._get_shopinvader_price_fields()):
+            self.env["shopinvader.variant"]._delay_refresh_price_snapshot(
+                self.env["shopinvader.backend"].search([]),
+                [("record_id", "in", self.ids)],
+            )
+        return res
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductTemplate(models.Model):
+    _inherit = "product.template"
+
+    @api.model
+    def _get_shopinvader_price_fields(self):
+        return ["list_price", "taxes_id", "categ_id", "uom_id"]
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductTemplate, self).write(vals)
+        if set(vals) & set(self._get_shopinvader_price_fields()):
+            self.env["shopinvader.variant"]._delay_refresh_price_snapshot(
+                self.env["shopinvader.backend"].search([]),
+                [("product_tmpl_id", "in", self.ids)],
+            )
+        return res
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import hashlib
+import json
+
+from odoo import api, fields, models
+from odoo.addons.queue_job.job import job
+
+
+class SeBinding(models.AbstractModel):
+    _inherit = "se.binding"
+
+    data_hash = fields.Char(
+        readonly=True,
+        copy=False,
+        help="Hash of the data of the last export to the search engine",
+    )
+
+    def _get_export_key(self, field_name):
+        """
+        Get the key used by the exporter of the index to export the field
+        (the alias of the export line if any)
+        :param field_name: str
+        :return: str or False if the field is not exported
+        """
+        self.ensure_one()
+        line = self.env["ir.exports.line"].search(
+            [
+                ("export_id", "=", self.index_id.exporter_id.id),
+                ("name", "=", field_name),
+            ],
+            limit=1,
+        )
+        if line.alias:
+            return line.alias.split(":")[1]
+        else:
+            return line.name
+
+    @api.multi
+    def export_partial(self, keys, in_sync=None):
+        """
+        Export only the given keys of the data (if the backend adapter
+        supports partial updates, else the whole data are exported)
+        :param keys: list of keys of the data
+        :param in_sync: bindings whose data were exported before the change
+            of the given keys: their whole data are in the index after the
+            partial export
+        """
+        return self.with_context(
+            se_partial_export_keys=keys,
+            se_partial_export_in_sync_ids=in_sync.ids if in_sync else [],
+        ).export()
+
+    def _is_data_exported(self):
+        """
+        Return True if the data of the binding are the data in the index
+        """
+        self.ensure_one()
+        return (
+            self.sync_state == "done"
+            and bool(self.data_hash)
+            and self.data_hash == self._get_data_hash()
+        )
+
+    def _get_data_hash(self):
+        self.ensure_one()
+        payload = json.dumps(self.data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _write_data_hashes(self, hashes):
+        """
+        Store the hash of the exported data of the bindings with one query
+        :param hashes: dict {binding id: hash}
+        """
+        if not self:
+            return
+        rows = [(record.id, hashes[record.id]) for record in self]
+        self.env.cr.execute(
+            """
+            UPDATE %s AS b
+            SET data_hash = v.data_hash
+            FROM (VALUES %s) AS v(id, data_hash)
+            WHERE b.id = v.id
+            """
+            % (self._table, ", ".join(["%s"] * len(rows))),
+            rows,
+        )
+        self.invalidate_cache(["data_hash"], self.ids)
+
+    @api.multi
+    @job(default_channel="root.search_engine.recompute_json")
+    def recompute_json(self, *args, **kwargs):
+        done = self.filtered(lambda b: b.sync_state == "done")
+        res = super(SeBinding, self).recompute_json(*args, **kwargs)
+        # the data have been recomputed but are the same than the data
+        # already exported: nothing to export
+        done.filtered(
+            lambda b: b.sync_state == "to_update"
+            and b.data_hash
+            and b.data_hash == b._get_data_hash()
+        ).write({"sync_state": "done"})
+        return res
+
+    @api.multi
+    def write(self, vals):
+        if "active" in vals:
+            # the inactive bindings are removed from the index, they must be
+            # exported again when activated
+            vals = dict(vals, data_hash=False)
+        return super(SeBinding, self).write(vals)
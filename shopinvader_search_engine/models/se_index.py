@@ -2,7 +2,10 @@
 # Copyright 2013 Akretion (http://www.akretion.com)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import api, fields, models
+from odoo import _, api, fields, models
+from odoo.addons.queue_job.job import job
+
+EXPORT_CHUNK_SIZE = 500
 
 
 class SeIndex(models.Model):
@@ -10,6 +13,43 @@ class SeIndex(models.Model):
     _inherit = "se.index"
 
     is_valid = fields.Char(compute="_compute_is_valid")
+    export_chunk_size = fields.Integer(
+        default=EXPORT_CHUNK_SIZE,
+        help="Number of bindings computed and exported by each job of the "
+        "streaming export",
+    )
+    export_cursor = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Id of the last binding exported by the streaming export. "
+        "An interrupted export is resumed after this binding",
+    )
+    export_recompute = fields.Boolean(
+        readonly=True,
+        copy=False,
+        help="The streaming export recompute the data of the bindings",
+    )
+    export_generation = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Incremented at each start of the streaming export to stop the "
+        "jobs of the previous export",
+    )
+    export_running = fields.Boolean(readonly=True, copy=False)
+    export_pushed_count = fields.Integer(
+        "Pushed documents",
+        readonly=True,
+        copy=False,
+        help="Number of documents pushed to the search engine since the "
+        "start of the last export",
+    )
+    export_skipped_count = fields.Integer(
+        "Skipped documents",
+        readonly=True,
+        copy=False,
+        help="Number of documents not pushed to the search engine since the "
+        "start of the last export as their data have not changed",
+    )
 
     @api.depends("lang_id", "model_id")
     def _compute_is_valid(self):
@@ -18,3 +58,125 @@ class SeIndex(models.Model):
             active_id = self.env["shopinvader.backend"].browse(active_id)
             if active_id and rec.lang_id in active_id.lang_ids:
                 rec.is_valid = True
+
+    @api.multi
+    def start_stream_export(self, recompute=True):
+        """
+        Export all the bindings of the indexes by chunks of bindings ordered
+        by id. Each chunk is computed (if recompute is True) and exported by
+        its own job which delays the job of the next chunk.
+        :param recompute: recompute the data of the bindings before the
+            export
+        """
+        for record in self:
+            record.write({"export_cursor": 0, "export_recompute": recompute})
+        self.reset_export_counters()
+        return self.resume_stream_export()
+
+    @api.multi
+    def reset_export_counters(self):
+        self.write({"export_pushed_count": 0, "export_skipped_count": 0})
+        return True
+
+    def _add_export_counters(self, pushed, skipped):
+        """
+        Increment the counters of pushed and skipped documents. The
+        counters are incremented in SQL as the export jobs of an index can
+        run in parallel.
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            UPDATE se_index
+            SET export_pushed_count = coalesce(export_pushed_count, 0) + %s,
+                export_skipped_count = coalesce(export_skipped_count, 0) + %s
+            WHERE id = %s
+            """,
+            (pushed, skipped, self.id),
+        )
+        self.invalidate_cache(
+            ["export_pushed_count", "export_skipped_count"], self.ids
+        )
+
+    @api.multi
+    def clear_index(self):
+        res = super(SeIndex, self).clear_index()
+        # the documents are not in the index anymore, they must be pushed
+        # at the next export
+        for record in self:
+            self.env[record.model_id.model].search(
+                [("index_id", "=", record.id), ("data_hash", "!=", False)]
+            ).write({"data_hash": False})
+        return res
+
+    @api.multi
+    def resume_stream_export(self):
+        """
+        Continue the streaming export after the last exported binding
+        """
+        for record in self:
+            record.write(
+                {
+                    "export_generation": record.export_generation + 1,
+                    "export_running": True,
+                }
+            )
+            record._delay_stream_export_chunk()
+        return True
+
+    def _delay_stream_export_chunk(self):
+        self.ensure_one()
+        description = _("Export the bindings of the index %s after id %s") % (
+            self.name,
+            self.export_cursor,
+        )
+        self.with_delay(description=description)._stream_export_chunk(
+            self.export_generation
+        )
+
+    def _get_stream_export_domain(self):
+        self.ensure_one()
+        return [("index_id", "=", self.id), ("id", ">", self.export_cursor)]
+
+    def _stream_export_bindings(self, bindings):
+        """
+        Compute (if needed) and export the given bindings
+        :param bindings: recordset of se.binding
+        """
+        if self.export_recompute:
+            bindings.recompute_json()
+        bindings = bindings.filtered("data")
+        if bindings:
+            bindings.export()
+            bindings.filtered(lambda b: b.sync_state != "done").write(
+                {"sync_state": "done"}
+            )
+
+    @api.multi
+    @job(default_channel="root.search_engine")
+    def _stream_export_chunk(self, generation):
+        """
+        Export the next chunk of bindings of the index and delay the export
+        of the following chunk. The cursor is stored with the exported chunk
+        so an interrupted export can be resumed.
+        :param generation: int, the job is ignored if a new export has been
+            started since its creation
+        """
+        self.ensure_one()
+        if not self.export_running or generation != self.export_generation:
+            return _("Export stopped or restarted")
+        bindings = self.env[self.model_id.model].search(
+            self._get_stream_export_domain(),
+            order="id",
+            limit=self.export_chunk_size or EXPORT_CHUNK_SIZE,
+        )
+        if not bindings:
+            self.write({"export_cursor": 0, "export_running": False})
+            return _("Export done")
+        self._stream_export_bindings(bindings)
+        cursor = bindings[-1].id
+        # release the memory used by the chunk before the next one
+        self.env.invalidate_all()
+        self.write({"export_cursor": cursor})
+        self._delay_stream_export_chunk()
+        return _("Exported %s bindings until id %s") % (len(bindings), cursor)
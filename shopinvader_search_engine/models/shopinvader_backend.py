@@ -17,15 +17,36 @@ class ShopinvaderBackend(models.Model):
         domain = self.env["se.index"]._get_model_domain()
         return self.env["ir.model"].search(domain)
 
+    @api.multi
+    def write(self, vals):
+        res = super(ShopinvaderBackend, self).write(vals)
+        if "pricelist_id" in vals:
+            self.force_refresh_price_snapshot()
+        return res
+
+    @api.multi
+    def force_refresh_price_snapshot(self):
+        self.env["shopinvader.variant"]._delay_refresh_price_snapshot(self)
+        return True
+
     @api.multi
     def force_recompute_all_binding_index(self):
-        self.mapped("se_backend_id.index_ids").force_recompute_all_binding()
+        indexes = self.mapped("se_backend_id.index_ids")
+        indexes.start_stream_export(recompute=True)
         return True
 
     @api.multi
     def force_batch_export_index(self):
-        for index in self.mapped("se_backend_id.index_ids"):
-            index.force_batch_export()
+        indexes = self.mapped("se_backend_id.index_ids")
+        indexes.start_stream_export(recompute=False)
+        return True
+
+    @api.multi
+    def resume_export_index(self):
+        indexes = self.mapped("se_backend_id.index_ids").filtered(
+            "export_running"
+        )
+        indexes.resume_stream_export()
         return True
 
     @api.multi
@@ -3,7 +3,14 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import json
+from datetime import timedelta
+
 from odoo import api, fields, models
+from odoo.addons.queue_job.job import job
+from odoo.osv import expression
+
+PRICE_SNAPSHOT_CHUNK_SIZE = 1000
 
 
 class ShopinvaderVariant(models.Model):
@@ -14,6 +21,11 @@ class ShopinvaderVariant(models.Model):
     index_id = fields.Many2one(
         compute="_compute_index", store=True, required=False
     )
+    price_snapshot_ids = fields.One2many(
+        "shopinvader.variant.price",
+        "shopinvader_variant_id",
+        "Price Snapshot",
+    )
 
     @api.depends(
         "backend_id.se_backend_id",
@@ -35,3 +47,360 @@ class ShopinvaderVariant(models.Model):
                 and r.lang_id == i.lang_id
             )
             record.index_id = fields.first(index)
+
+    def _compute_price(self):
+        records = self.filtered(lambda r: not isinstance(r.id, models.NewId))
+        prices = records._get_price_snapshot_prices()
+        for record in records:
+            record.price = prices[record.id]
+        super(ShopinvaderVariant, self - records)._compute_price()
+
+    def _read_price_snapshot(self):
+        """
+        Read the stored price snapshot of the variants, the expired prices
+        are ignored
+        :return: tuple ({variant id: {price key: price dict}},
+            {variant id: expiry date})
+        """
+        prices = {}
+        expiry_dates = {}
+        if not self.ids:
+            return prices, expiry_dates
+        self.env.cr.execute(
+            """
+            SELECT shopinvader_variant_id, key, value, original_value,
+                discount, tax_included, expiry_date
+            FROM shopinvader_variant_price
+            WHERE shopinvader_variant_id IN %s
+                AND (expiry_date IS NULL OR expiry_date > %s)
+            """,
+            (tuple(self.ids), fields.Date.context_today(self)),
+        )
+        for row in self.env.cr.fetchall():
+            prices.setdefault(row[0], {})[row[1]] = {
+                "value": row[2],
+                "original_value": row[3],
+                "discount": row[4],
+                "tax_included": row[5],
+            }
+            expiry_dates[row[0]] = row[6] and fields.Date.to_string(row[6])
+        return prices, expiry_dates
+
+    @api.model
+    def _get_price_expiry_date(self, backend):
+        """
+        Get the date from which the prices computed today for the backend
+        can change because a pricelist item starts or ends
+        :param backend: shopinvader.backend recordset
+        :return: str (date) or None
+        """
+        pricelists = self.env["product.pricelist"].browse()
+        for key, pricelist, fpos in self._get_price_configuration(backend):
+            pricelists |= pricelist
+        today = fields.Date.context_today(self)
+        pricelists = pricelists._get_base_pricelists()
+        items = self.env["product.pricelist.item"].search(
+            [
+                ("pricelist_id", "in", pricelists.ids),
+                "|",
+                ("date_start", ">", today),
+                ("date_end", ">=", today),
+            ]
+        )
+        dates = []
+        for item in items:
+            if item.date_start and item.date_start > today:
+                dates.append(item.date_start)
+            if item.date_end and item.date_end >= today:
+                # the item is applied until its end date included
+                date_end = fields.Date.from_string(item.date_end)
+                dates.append(
+                    fields.Date.to_string(date_end + timedelta(days=1))
+                )
+        return min(dates) if dates else None
+
+    def _compute_price_snapshot(self):
+        """
+        Compute the prices of the variants and the date until which they
+        are valid
+        :return: tuple ({variant id: {price key: price dict}},
+            {variant id: expiry date})
+        """
+        prices = self._get_all_prices()
+        expiry_dates = {}
+        for backend in self.mapped("backend_id"):
+            expiry_date = self._get_price_expiry_date(backend)
+            records = self.filtered(lambda r, b=backend: r.backend_id == b)
+            for record in records:
+                expiry_dates[record.id] = expiry_date
+        return prices, expiry_dates
+
+    def _write_price_snapshot(self, new_snapshot, snapshot):
+        """
+        Store the given snapshot of the variants, only the price keys that
+        are new or have changed are written.
+        :param new_snapshot: the snapshot to store (see
+            `_compute_price_snapshot`)
+        :param snapshot: the current snapshot (see `_read_price_snapshot`)
+        """
+        prices, expiry_dates = new_snapshot
+        old_snapshot, old_expiry_dates = snapshot
+        to_delete = []
+        to_write = []
+        for record in self:
+            old_prices = old_snapshot.get(record.id, {})
+            new_prices = prices[record.id]
+            expiry_date = expiry_dates[record.id]
+            expiry_changed = old_expiry_dates.get(record.id) != expiry_date
+            for key in old_prices:
+                if key not in new_prices:
+                    to_delete.append((record.id, key))
+            for key, price in new_prices.items():
+                if expiry_changed or old_prices.get(key) != price:
+                    to_write.append(
+                        (
+                            record.id,
+                            key,
+                            price["value"],
+                            price["original_value"],
+                            price["discount"],
+                            bool(price["tax_included"]),
+                            expiry_date,
+                            self.env.uid,
+                            self.env.uid,
+                        )
+                    )
+        cr = self.env.cr
+        if to_delete:
+            cr.execute(
+                """
+                DELETE FROM shopinvader_variant_price
+                WHERE (shopinvader_variant_id, key) IN %s
+                """,
+                (tuple(to_delete),),
+            )
+        for i in range(0, len(to_write), PRICE_SNAPSHOT_CHUNK_SIZE):
+            rows = to_write[i : i + PRICE_SNAPSHOT_CHUNK_SIZE]
+            cr.execute(
+                """
+                INSERT INTO shopinvader_variant_price (
+                    shopinvader_variant_id, key, value, original_value,
+                    discount, tax_included, expiry_date, create_uid,
+                    write_uid, create_date, write_date)
+                SELECT v.id, v.key, v.value, v.original_value, v.discount,
+                    v.tax_included, v.expiry_date::date, v.create_uid,
+                    v.write_uid, now() at time zone 'UTC',
+                    now() at time zone 'UTC'
+                FROM (VALUES %s) AS v(id, key, value, original_value,
+                    discount, tax_included, expiry_date, create_uid,
+                    write_uid)
+                ON CONFLICT (shopinvader_variant_id, key) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    original_value = EXCLUDED.original_value,
+                    discount = EXCLUDED.discount,
+                    tax_included = EXCLUDED.tax_included,
+                    expiry_date = EXCLUDED.expiry_date,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                """
+                % ", ".join(["%s"] * len(rows)),
+                rows,
+            )
+        self.env["shopinvader.variant.price"].invalidate_cache()
+
+    def _filter_outdated_price_snapshot(self, prices):
+        """
+        Get the variants without snapshot or with a snapshot not matching
+        the price configuration of their backend
+        :param prices: the prices of the current snapshot (see
+            `_read_price_snapshot`)
+        :return: shopinvader.variant recordset
+        """
+        outdated = self.browse()
+        for backend in self.mapped("backend_id"):
+            records = self.filtered(lambda r, b=backend: r.backend_id == b)
+            keys = {
+                key
+                for key, pricelist, fpos in records._get_price_configuration(
+                    backend
+                )
+            }
+            outdated |= records.filtered(
+                lambda r, k=keys: set(prices.get(r.id, {})) != k
+            )
+        return outdated
+
+    def _get_price_snapshot_prices(self):
+        """
+        Get the prices of the variants from the snapshot. The prices of the
+        variants without an up to date snapshot are computed but not stored
+        (see `_update_price_snapshot`).
+        :return: dict {variant id: {price key: price dict}}
+        """
+        prices = self._read_price_snapshot()[0]
+        res = {record.id: prices.get(record.id, {}) for record in self}
+        to_compute = self._filter_outdated_price_snapshot(prices)
+        if to_compute:
+            res.update(to_compute._get_all_prices())
+        return res
+
+    def _update_price_snapshot(self):
+        """
+        Compute and store the prices of the variants without an up to date
+        snapshot
+        """
+        snapshot = self._read_price_snapshot()
+        records = self._filter_outdated_price_snapshot(snapshot[0])
+        if records:
+            records._write_price_snapshot(
+                records._compute_price_snapshot(), snapshot
+            )
+
+    @api.multi
+    @job(default_channel="root.search_engine.recompute_json")
+    def recompute_json(self, *args, **kwargs):
+        # the prices are stored before the computation of the data so the
+        # data and the snapshot are in sync
+        self._update_price_snapshot()
+        return super(ShopinvaderVariant, self).recompute_json(*args, **kwargs)
+
+    def _get_price_export_key(self):
+        return self._get_export_key("price")
+
+    @api.multi
+    @job(default_channel="root.search_engine.price")
+    def _refresh_price_snapshot(self):
+        """
+        Compute the prices of the variants and update the snapshot of the
+        variants with a changed price. If the binding have been already
+        computed, the new price is set in the data field and the binding is
+        forced to 'to_update' if it was in done state.
+        :return: the shopinvader.variant with a changed price
+        """
+        snapshot = self._read_price_snapshot()
+        new_snapshot = self._compute_price_snapshot()
+        self._write_price_snapshot(new_snapshot, snapshot)
+        prices = new_snapshot[0]
+        changed = self.filtered(
+            lambda r: prices[r.id] != snapshot[0].get(r.id, {})
+        )
+        changed._update_price_data(prices)
+        return changed
+
+    def _update_price_data(self, prices):
+        """
+        Set the given prices in the data of the bindings already computed,
+        the bindings in done state are forced to 'to_update'. All the
+        bindings are updated with one query.
+        :param prices: dict {variant id: {price key: price dict}}
+        """
+        rows = []
+        export_keys = {}
+        for binding in self:
+            if binding.sync_state == "new":
+                # the binding is not yet on the site, the right price will
+                # be exported at its first export
+                continue
+            if binding.index_id not in export_keys:
+                export_keys[binding.index_id] = binding._get_price_export_key()
+            price_export_key = export_keys[binding.index_id]
+            if not price_export_key:
+                continue
+            data = binding.data
+            if data.get(price_export_key) != prices[binding.id]:
+                data[price_export_key] = prices[binding.id]
+                rows.append((binding.id, json.dumps(data), self.env.uid))
+        if not rows:
+            return
+        self.env.cr.execute(
+            """
+            UPDATE shopinvader_variant AS b
+            SET data = v.data,
+                sync_state = CASE WHEN b.sync_state = 'done'
+                    THEN 'to_update' ELSE b.sync_state END,
+                write_uid = v.write_uid,
+                write_date = now() at time zone 'UTC'
+            FROM (VALUES %s) AS v(id, data, write_uid)
+            WHERE b.id = v.id
+            """
+            % ", ".join(["%s"] * len(rows)),
+            rows,
+        )
+        self.invalidate_cache(
+            ["data", "sync_state", "write_uid", "write_date"],
+            [row[0] for row in rows],
+        )
+
+    @api.model
+    def _price_configuration_changed(self, backends):
+        res = super(ShopinvaderVariant, self)._price_configuration_changed(
+            backends
+        )
+        self._delay_refresh_price_snapshot(backends)
+        return res
+
+    @api.model
+    def _get_backends_using_price(self, pricelists=None, fpositions=None):
+        """
+        Get the backends exporting a price computed with one of the given
+        pricelists or fiscal positions
+        :param pricelists: product.pricelist recordset
+        :param fpositions: account.fiscal.position recordset
+        :return: shopinvader.backend recordset
+        """
+        backends = self.env["shopinvader.backend"].browse()
+        for backend in self.env["shopinvader.backend"].search([]):
+            for key, pricelist, fpos in self._get_price_configuration(
+                backend
+            ):
+                if (pricelists and pricelist & pricelists) or (
+                    fpositions and fpos and fpos & fpositions
+                ):
+                    backends |= backend
+                    break
+        return backends
+
+    @api.model
+    def _delay_refresh_price_snapshot(self, backends, domain=None):
+        """
+        Delay the refresh of the price snapshot of the variants of the given
+        backends matching the domain. Only the variants with a snapshot are
+        refreshed, the other ones will have their prices computed and stored
+        at their first export.
+        :param backends: shopinvader.backend recordset
+        :param domain: domain on shopinvader.variant
+        :return: the number of variants to refresh
+        """
+        if not backends:
+            return 0
+        domain = expression.AND(
+            [
+                domain or [],
+                [
+                    ("backend_id", "in", backends.ids),
+                    ("price_snapshot_ids", "!=", False),
+                ],
+            ]
+        )
+        variant_ids = self.search(domain).ids
+        for i in range(0, len(variant_ids), PRICE_SNAPSHOT_CHUNK_SIZE):
+            variants = self.browse(
+                variant_ids[i : i + PRICE_SNAPSHOT_CHUNK_SIZE]
+            )
+            variants.with_delay(
+                description="Refresh the price snapshot of %s variants"
+                % len(variants)
+            )._refresh_price_snapshot()
+        return len(variant_ids)
+
+    @api.model
+    def _cron_refresh_expired_price_snapshot(self):
+        """
+        Refresh the snapshot of the variants whose prices have expired
+        because a pricelist item has started or ended
+        """
+        today = fields.Date.context_today(self)
+        return self._delay_refresh_price_snapshot(
+            self.env["shopinvader.backend"].search([]),
+            [("price_snapshot_ids.expiry_date", "<=", today)],
+        )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import fields, models
+
+
+class ShopinvaderVariantPrice(models.Model):
+    """
+    Snapshot of the prices exported for a shopinvader variant.
+    One line is stored for each price key of the variant (see
+    `shopinvader.variant._get_price_configuration`).
+    The snapshot is read and written with SQL (see
+    `shopinvader.variant._read_price_snapshot` and
+    `shopinvader.variant._write_price_snapshot`) to be able to manage the
+    prices of a lot of variants at once.
+    """
+
+    _name = "shopinvader.variant.price"
+    _description = "Shopinvader Variant Price Snapshot"
+
+    shopinvader_variant_id = fields.Many2one(
+        "shopinvader.variant",
+        "Shopinvader Variant",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    key = fields.Char(required=True)
+    # no digits to store the exact value exported (float8)
+    value = fields.Float()
+    original_value = fields.Float()
+    discount = fields.Float()
+    tax_included = fields.Boolean()
+    expiry_date = fields.Date(
+        index=True,
+        help="The prices must be computed again from this date as a "
+        "pricelist item starts or ends",
+    )
+
+    _sql_constraints = [
+        (
+            "variant_key_uniq",
+            "unique(shopinvader_variant_id, key)",
+            "A price key must be unique per variant",
+        )
+    ]
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import test_price_snapshot
+from . import test_stream_export
+from . import test_export_hash
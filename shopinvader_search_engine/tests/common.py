@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo.addons.connector_search_engine.tests.test_all import (
+    TestBindingIndexBaseFake,
+)
+from odoo.addons.queue_job.tests.common import JobMixin
+
+
+class SearchEngineCommonCase(TestBindingIndexBaseFake, JobMixin):
+    @classmethod
+    def setUpClass(cls):
+        super(SearchEngineCommonCase, cls).setUpClass()
+        cls.env = cls.env(
+            context=dict(
+                cls.env.context,
+                tracking_disable=True,  # speed up tests
+                test_queue_job_no_delay=False,  # we want the jobs
+            )
+        )
+
+    def setUp(self):
+        super(SearchEngineCommonCase, self).setUp()
+        ref = self.env.ref
+        self.shopinvader_backend = ref("shopinvader.backend_1")
+        self.shopinvader_backend.bind_all_product()
+        self.index = self.env["se.index"].create(
+            {
+                "name": "test-product-index",
+                "backend_id": self.backend_specific.se_backend_id.id,
+                "exporter_id": ref(
+                    "shopinvader.ir_exp_shopinvader_variant"
+                ).id,
+                "lang_id": ref("base.lang_en").id,
+                "model_id": ref("shopinvader.model_shopinvader_variant").id,
+            }
+        )
+        self.shopinvader_backend.se_backend_id = (
+            self.backend_specific.se_backend_id
+        )
+        self.product = ref("product.product_product_4")
+        self.variant = self.product.shopinvader_bind_ids
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import mock
+
+from odoo.addons.connector_search_engine.tests.models import SeAdapterFake
+
+from .common import SearchEngineCommonCase
+
+
+class TestExportHash(SearchEngineCommonCase):
+    def setUp(self):
+        super(TestExportHash, self).setUp()
+        self.variant.recompute_json()
+        self._export()
+        self.index.reset_export_counters()
+
+    def _export(self):
+        with SeAdapterFake.mocked_calls() as calls:
+            self.variant.export()
+        return calls
+
+    def test_export_skip_unchanged(self):
+        data_hash = self.variant.data_hash
+        self.assertEqual(data_hash, self.variant._get_data_hash())
+        self.assertFalse(self._export())
+        self.assertEqual(self.variant.data_hash, data_hash)
+        self.assertEqual(self.variant.sync_state, "done")
+        self.assertEqual(self.index.export_pushed_count, 0)
+        self.assertEqual(self.index.export_skipped_count, 1)
+
+    def test_recompute_unchanged(self):
+        self.variant.sync_state = "done"
+        self.variant.recompute_json()
+        self.assertEqual(self.variant.sync_state, "done")
+
+    def test_export_changed(self):
+        data_hash = self.variant.data_hash
+        self.product.name = "New name"
+        self.variant.recompute_json()
+        self.assertEqual(self.variant.sync_state, "to_update")
+        calls = self._export()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]["args"][0][0], self.variant.data)
+        self.assertNotEqual(self.variant.data_hash, data_hash)
+        self.assertEqual(self.variant.data_hash, self.variant._get_data_hash())
+        self.assertEqual(self.index.export_pushed_count, 1)
+        self.assertEqual(self.index.export_skipped_count, 0)
+
+    def test_hash_reset_on_active(self):
+        # the inactive binding is removed from the index
+        self.variant.active = False
+        self.assertFalse(self.variant.data_hash)
+        self.variant.active = True
+        self.assertFalse(self.variant.data_hash)
+        self.assertEqual(len(self._export()), 1)
+        self.assertEqual(self.variant.data_hash, self.variant._get_data_hash())
+
+    def test_export_partial(self):
+        self.product.name = "New name"
+        self.variant.recompute_json()
+        price_key = self.variant._get_price_export_key()
+        with mock.patch.object(
+            SeAdapterFake, "partial_update", create=True
+        ) as partial_update:
+            self.variant.export_partial([price_key])
+        partial_update.assert_called_once_with(
+            [
+                {
+                    "objectID": self.variant.record_id.id,
+                    price_key: self.variant.data[price_key],
+                }
+            ]
+        )
+        # the index does not have the whole data
+        self.assertFalse(self.variant.data_hash)
+        self.assertEqual(len(self._export()), 1)
+        self.assertEqual(self.variant.data_hash, self.variant._get_data_hash())
+
+    def test_export_partial_in_sync(self):
+        price_key = self.variant._get_price_export_key()
+        data = dict(self.variant.data)
+        data[price_key] = {"default": {"value": 42.0}}
+        self.variant.write({"data": data})
+        with mock.patch.object(
+            SeAdapterFake, "partial_update", create=True
+        ) as partial_update:
+            self.variant.export_partial([price_key], in_sync=self.variant)
+        self.assertEqual(partial_update.call_count, 1)
+        # the index has the whole data of the binding
+        self.assertEqual(self.variant.data_hash, self.variant._get_data_hash())
+        self.assertFalse(self._export())
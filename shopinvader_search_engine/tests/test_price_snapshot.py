@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from datetime import timedelta
+
+from odoo import fields
+
+from .common import SearchEngineCommonCase
+
+
+class TestPriceSnapshot(SearchEngineCommonCase):
+    def setUp(self):
+        super(TestPriceSnapshot, self).setUp()
+        self.pricelist = self.shopinvader_backend.pricelist_id
+        self.today = fields.Date.context_today(self.variant)
+
+    def _add_days(self, date, days):
+        date = fields.Date.from_string(date) + timedelta(days=days)
+        return fields.Date.to_string(date)
+
+    def _create_item(self, **kwargs):
+        vals = {
+            "pricelist_id": self.pricelist.id,
+            "applied_on": "0_product_variant",
+            "product_id": self.product.id,
+            "compute_price": "percentage",
+            "percent_price": 20,
+        }
+        vals.update(kwargs)
+        return self.env["product.pricelist.item"].create(vals)
+
+    def _export_variant(self):
+        self.variant.recompute_json()
+        self.variant.sync_state = "done"
+        return self.variant.data[self.variant._get_price_export_key()]
+
+    def test_snapshot_stored_on_recompute(self):
+        # reading the price does not store the snapshot
+        price = self.variant.price
+        self.assertFalse(self.variant.price_snapshot_ids)
+        self.assertEqual(self._export_variant(), price)
+        self.assertEqual(
+            self.variant.price_snapshot_ids.mapped("key"), ["default"]
+        )
+        self.assertFalse(self.variant.price_snapshot_ids.expiry_date)
+
+    def test_refresh_on_pricelist_item(self):
+        old_price = self._export_variant()["default"]
+        jobs = self.job_counter()
+        self._create_item()
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        price = self.variant.price["default"]
+        self.assertAlmostEqual(price["value"], old_price["value"] * 0.8)
+        self.assertEqual(
+            self.variant.data[self.variant._get_price_export_key()],
+            self.variant.price,
+        )
+        self.assertEqual(self.variant.sync_state, "to_update")
+
+    def test_refresh_on_pricelist_discount_policy(self):
+        self._create_item()
+        self._export_variant()
+        self.assertEqual(self.variant.price["default"]["discount"], 0.0)
+        jobs = self.job_counter()
+        self.pricelist.discount_policy = "without_discount"
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        self.assertEqual(self.variant.price["default"]["discount"], 20.0)
+        self.assertEqual(self.variant.sync_state, "to_update")
+
+    def test_refresh_on_attribute_price_extra(self):
+        old_price = self._export_variant()["default"]
+        value = self.product.attribute_value_ids[0]
+        attribute_price = self.env["product.attribute.price"].search(
+            [
+                ("product_tmpl_id", "=", self.product.product_tmpl_id.id),
+                ("value_id", "=", value.id),
+            ]
+        )
+        jobs = self.job_counter()
+        if attribute_price:
+            attribute_price.price_extra += 10
+        else:
+            self.env["product.attribute.price"].create(
+                {
+                    "product_tmpl_id": self.product.product_tmpl_id.id,
+                    "value_id": value.id,
+                    "price_extra": 10,
+                }
+            )
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        self.assertAlmostEqual(
+            self.variant.price["default"]["value"], old_price["value"] + 10
+        )
+
+    def test_expiry_date(self):
+        tomorrow = self._add_days(self.today, 1)
+        self._create_item(date_start=tomorrow)
+        self._create_item(
+            date_end=self._add_days(self.today, 5),
+            applied_on="3_global",
+            product_id=False,
+        )
+        self._export_variant()
+        # the snapshot expires when the first item starts
+        self.assertEqual(
+            self.variant.price_snapshot_ids.expiry_date, tomorrow
+        )
+        self.assertTrue(self.variant._read_price_snapshot()[0])
+        # the expired prices are ignored
+        self.variant.price_snapshot_ids.write({"expiry_date": self.today})
+        self.assertFalse(self.variant._read_price_snapshot()[0])
+        jobs = self.job_counter()
+        self.env["shopinvader.variant"]._cron_refresh_expired_price_snapshot()
+        self.assertEqual(jobs.count_created(), 1)
+        self.perform_jobs(jobs)
+        self.assertEqual(
+            self.variant.price_snapshot_ids.expiry_date, tomorrow
+        )
+
+    def test_refresh_batch(self):
+        variants = self.variant | self.env["shopinvader.variant"].search(
+            [("backend_id", "=", self.shopinvader_backend.id)], limit=10
+        )
+        variants.recompute_json()
+        variants.write({"sync_state": "done"})
+        self._create_item(
+            applied_on="2_product_category",
+            product_id=False,
+            categ_id=self.env.ref("product.product_category_all").id,
+        )
+        changed = variants._refresh_price_snapshot()
+        self.assertIn(self.variant, changed)
+        for variant in changed:
+            self.assertEqual(variant.sync_state, "to_update")
+            self.assertEqual(
+                variant.data[variant._get_price_export_key()], variant.price
+            )
+        for variant in variants - changed:
+            self.assertEqual(variant.sync_state, "done")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017 Akretion (http://www.akretion.com).
+# @author Sébastien BEAU <sebastien.beau@akretion.com>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo.addons.connector_search_engine.tests.models import SeAdapterFake
+
+from .common import SearchEngineCommonCase
+
+
+class TestStreamExport(SearchEngineCommonCase):
+    def setUp(self):
+        super(TestStreamExport, self).setUp()
+        self.bindings = self.env["shopinvader.variant"].search(
+            [("index_id", "=", self.index.id)], order="id"
+        )
+        self.index.export_chunk_size = 2
+
+    def _export_chunk(self, generation):
+        with SeAdapterFake.mocked_calls() as calls:
+            res = self.index._stream_export_chunk(generation)
+        return res, calls
+
+    def _get_exported_ids(self, calls):
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]["method"], "index")
+        return [data["objectID"] for data in calls[0]["args"][0]]
+
+    def test_stream_export_resume(self):
+        jobs = self.job_counter()
+        self.index.start_stream_export()
+        self.assertEqual(jobs.count_created(), 1)
+        self.assertTrue(self.index.export_running)
+        generation = self.index.export_generation
+        res, calls = self._export_chunk(generation)
+        self.assertEqual(
+            self._get_exported_ids(calls),
+            self.bindings[:2].mapped("record_id").ids,
+        )
+        self.assertEqual(self.index.export_cursor, self.bindings[1].id)
+        # the export is resumed after the cursor by a new generation
+        self.index.resume_stream_export()
+        self.assertEqual(self.index.export_generation, generation + 1)
+        res, calls = self._export_chunk(generation + 1)
+        self.assertEqual(
+            self._get_exported_ids(calls),
+            self.bindings[2:4].mapped("record_id").ids,
+        )
+        self.assertEqual(self.index.export_cursor, self.bindings[3].id)
+
+    def test_stream_export_stale_generation(self):
+        self.index.start_stream_export()
+        generation = self.index.export_generation
+        # a new export is started, the jobs of the previous one are ignored
+        self.index.start_stream_export()
+        res, calls = self._export_chunk(generation)
+        self.assertEqual(res, "Export stopped or restarted")
+        self.assertFalse(calls)
+        self.assertEqual(self.index.export_cursor, 0)
+        # the jobs of a stopped export are ignored too
+        self.index.export_running = False
+        res, calls = self._export_chunk(generation + 1)
+        self.assertEqual(res, "Export stopped or restarted")
+        self.assertFalse(calls)
+
+    def test_stream_export_done(self):
+        self.index.start_stream_export()
+        generation = self.index.export_generation
+        self.index.export_cursor = self.bindings[-2].id
+        res, calls = self._export_chunk(generation)
+        self.assertEqual(
+            self._get_exported_ids(calls), self.bindings[-1:].record_id.ids
+        )
+        self.assertEqual(self.bindings[-1].sync_state, "done")
+        jobs = self.job_counter()
+        res, calls = self._export_chunk(generation)
+        self.assertEqual(res, "Export done")
+        self.assertFalse(calls)
+        self.assertFalse(jobs.count_created())
+        self.assertFalse(self.index.export_running)
+        self.assertEqual(self.index.export_cursor, 0)